@@ -0,0 +1,124 @@
+"""
+Admission control for /detect.
+
+Each client (keyed by a client/session id) gets one running frame and at most
+one pending frame. A newer frame replaces the pending one, and the replaced
+request is answered as "skipped" without running YOLO. A global cap on the
+number of clients being served at once turns overload into a fast 503 with a
+retry hint instead of ever-growing latency.
+"""
+
+import threading
+import time
+
+
+class Overloaded(Exception):
+    """Raised when the global concurrency cap is reached."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Server busy, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    """A request waiting for its client's slot. state: waiting | run | skipped"""
+
+    __slots__ = ("state",)
+
+    def __init__(self):
+        self.state = "waiting"
+
+
+class _ClientSlot:
+    __slots__ = ("pending",)
+
+    def __init__(self):
+        self.pending = None  # _Ticket waiting behind the running frame
+
+
+class AdmissionController:
+    """Latest-frame-wins admission per client plus a global in-flight cap."""
+
+    def __init__(self, max_inflight: int = 8, wait_timeout: float = 5.0, retry_after: float = 0.5):
+        self.max_inflight = max(1, int(max_inflight))
+        self.wait_timeout = wait_timeout
+        self.retry_after = retry_after
+
+        self._cond = threading.Condition()
+        self._clients = {}  # client id -> _ClientSlot (only while it has a running frame)
+
+        # Counters for /stats
+        self.admitted = 0
+        self.skipped = 0
+        self.rejected = 0
+
+    @property
+    def inflight(self) -> int:
+        """Clients with a frame currently being processed."""
+        return len(self._clients)
+
+    def acquire(self, client_id: str) -> bool:
+        """
+        Wait for this client's slot. Returns True if the frame should be
+        processed (call release() afterwards), or False if a newer frame from
+        the same client replaced it. Raises Overloaded when the server is full.
+        """
+        with self._cond:
+            slot = self._clients.get(client_id)
+
+            # Client is idle: take a global slot right away or reject
+            if slot is None:
+                if len(self._clients) >= self.max_inflight:
+                    self.rejected += 1
+                    raise Overloaded(self.retry_after)
+                self._clients[client_id] = _ClientSlot()
+                self.admitted += 1
+                return True
+
+            # Client already has a frame running: become its pending frame
+            if slot.pending is not None:
+                slot.pending.state = "skipped"
+                self.skipped += 1
+            ticket = _Ticket()
+            slot.pending = ticket
+            self._cond.notify_all()
+
+            deadline = time.monotonic() + self.wait_timeout
+            while ticket.state == "waiting":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    ticket.state = "skipped"
+                    if slot.pending is ticket:
+                        slot.pending = None
+                    self.skipped += 1
+                    break
+                self._cond.wait(remaining)
+
+            if ticket.state == "run":
+                self.admitted += 1
+                return True
+            return False
+
+    def release(self, client_id: str):
+        """Finish the running frame and hand the slot to the pending one, if any."""
+        with self._cond:
+            slot = self._clients.get(client_id)
+            if slot is None:
+                return
+            if slot.pending is not None:
+                # Hand over directly, so the global slot stays with this client
+                slot.pending.state = "run"
+                slot.pending = None
+            else:
+                del self._clients[client_id]
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "max_inflight": self.max_inflight,
+                "inflight": len(self._clients),
+                "admitted": self.admitted,
+                "skipped": self.skipped,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,372 @@
+"""
+Benchmark suite for the detection server.
+
+Measures, on CPU and fully offline:
+  - per-stage latency: decode, rotate, inference, post-processing, serialization
+  - end-to-end latency (p50/p95/p99) and frames/sec for 1, 4, 16 and 64
+    simulated Netra clients, each sending a frame, waiting for the answer and
+    then sleeping 1 / FRAME_RATE like the app does
+
+Frames are the checked-in image*.jpg samples plus synthetic camera-like
+frames. By default the server runs in-process through the Flask test client;
+pass --url to hit a running server instead. Results are saved as JSON
+(tagged with the git commit) so runs can be compared across commits.
+
+Usage:
+  python benchmark.py
+  python benchmark.py --clients 1 4 --duration 10 --output before.json
+  python benchmark.py --url http://localhost:5000
+  python benchmark.py --compare before.json after.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+BACKEND_DIR = Path(__file__).parent
+RESULTS_DIR = BACKEND_DIR / "benchmark_results"
+
+STAGES = ["decode", "rotate", "inference", "postprocess", "serialize"]
+
+
+# ==================== FRAMES ====================
+def load_sample_frames(folder: Path) -> list:
+    """Checked-in sample images as (name, JPEG bytes)."""
+    frames = []
+    for path in sorted(folder.glob("image*.*")):
+        if path.suffix.lower() not in {".jpg", ".jpeg", ".png"}:
+            continue
+        frames.append((path.name, path.read_bytes()))
+    return frames
+
+
+def synthetic_frames(count: int, width: int = 1440, height: int = 1080,
+                     quality: int = 15, seed: int = 0) -> list:
+    """
+    Camera-like landscape frames (gradient background, noise, a few solid
+    shapes) encoded at Netra's JPEG quality (IMAGE_QUALITY 0.15).
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(count):
+        gradient = np.linspace(40, 200, width, dtype=np.float32)
+        img = np.repeat(gradient[None, :, None], height, axis=0).repeat(3, axis=2)
+        img += rng.normal(0, 12, img.shape).astype(np.float32)
+        img = np.clip(img, 0, 255).astype(np.uint8)
+        for _ in range(rng.integers(2, 6)):
+            x1, y1 = int(rng.integers(0, width - 100)), int(rng.integers(0, height - 100))
+            x2, y2 = x1 + int(rng.integers(60, width // 3)), y1 + int(rng.integers(60, height // 2))
+            color = tuple(int(c) for c in rng.integers(0, 255, 3))
+            cv2.rectangle(img, (x1, y1), (x2, y2), color, -1)
+        ok, buffer = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if ok:
+            frames.append((f"synthetic_{i}.jpg", buffer.tobytes()))
+    return frames
+
+
+# ==================== STATS ====================
+def summarize(samples: list) -> dict:
+    """Latency summary in ms."""
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples, dtype=np.float64)
+    return {
+        "count": int(values.size),
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# ==================== STAGE BENCHMARK ====================
+def benchmark_stages(server, frames: list, repeat: int) -> dict:
+    """Time each pipeline stage separately, in-process."""
+    timings = {stage: [] for stage in STAGES}
+    session = server.sessions.get("benchmark-stages")
+    max_edge = 0 if server.config.SKIP_RESIZE else server.config.MAX_IMAGE_EDGE
+
+    for _, data in frames:
+        for i in range(repeat + 1):  # first pass is warm-up
+            t0 = time.perf_counter()
+            frame = server.decode_image(data, max_edge)
+            t1 = time.perf_counter()
+            if not server.config.INFER_ON_UNROTATED:
+                frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
+            t2 = time.perf_counter()
+            result, _, _ = server.batcher.submit(frame)
+            t3 = time.perf_counter()
+            now = time.time()
+            detections, tracks, distances = server.postprocess_result(result, frame.shape, session, now)
+            server.track_alerts(detections, tracks, distances, now)
+            t4 = time.perf_counter()
+            with server.app.app_context():
+                server.app.json.dumps({"detections": detections})
+            t5 = time.perf_counter()
+
+            if i == 0:
+                continue
+            for stage, start, end in zip(STAGES, (t0, t1, t2, t3, t4), (t1, t2, t3, t4, t5)):
+                timings[stage].append((end - start) * 1000)
+
+    return {stage: summarize(values) for stage, values in timings.items()}
+
+
+# ==================== LOAD BENCHMARK ====================
+class InProcessClient:
+    """Posts frames through the Flask test client (one per simulated phone)."""
+
+    def __init__(self, server, client_id: str):
+        self.client = server.app.test_client()
+        self.client_id = client_id
+
+    def post(self, name: str, data: bytes) -> tuple:
+        response = self.client.post(
+            "/detect",
+            data={"image": (io.BytesIO(data), name), "clientId": self.client_id},
+            content_type="multipart/form-data"
+        )
+        return response.status_code, response.get_json(silent=True) or {}
+
+
+class HttpClient:
+    """Posts frames to a running server, reusing one connection per phone."""
+
+    def __init__(self, url: str, client_id: str):
+        import requests
+        self.session = requests.Session()
+        self.url = url.rstrip("/") + "/detect"
+        self.client_id = client_id
+
+    def post(self, name: str, data: bytes) -> tuple:
+        response = self.session.post(
+            self.url,
+            files={"image": (name, data, "image/jpeg")},
+            data={"clientId": self.client_id},
+            timeout=30
+        )
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        return response.status_code, body
+
+
+def simulate_client(make_client, index: int, frames: list, frame_interval: float,
+                    stop_at: float, out: dict):
+    """One simulated Netra phone: send, wait for the answer, sleep, repeat."""
+    client = make_client(f"bench-{index}")
+    latencies, processed, skipped, rejected, errors = [], 0, 0, 0, 0
+    i = index
+    while time.perf_counter() < stop_at:
+        name, data = frames[i % len(frames)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            status, body = client.post(name, data)
+        except Exception:
+            errors += 1
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+
+        if status == 503:
+            rejected += 1
+            time.sleep(float(body.get("retryAfter", 0.5)))
+            continue
+        if status != 200 or "error" in body:
+            errors += 1
+        elif body.get("skipped"):
+            skipped += 1
+        else:
+            processed += 1
+            latencies.append(elapsed)
+
+        if frame_interval > 0:
+            time.sleep(frame_interval)
+
+    out[index] = {
+        "latencies": latencies, "processed": processed,
+        "skipped": skipped, "rejected": rejected, "errors": errors
+    }
+
+
+def benchmark_load(make_client, frames: list, clients: int, duration: float, frame_rate: float) -> dict:
+    frame_interval = 1.0 / frame_rate if frame_rate > 0 else 0.0
+    results = {}
+    start = time.perf_counter()
+    stop_at = start + duration
+    threads = [
+        threading.Thread(
+            target=simulate_client,
+            args=(make_client, i, frames, frame_interval, stop_at, results),
+            daemon=True
+        )
+        for i in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = [lat for r in results.values() for lat in r["latencies"]]
+    processed = sum(r["processed"] for r in results.values())
+    return {
+        "clients": clients,
+        "duration_s": round(elapsed, 2),
+        "frames_per_sec": round(processed / elapsed, 2) if elapsed > 0 else 0.0,
+        "processed": processed,
+        "skipped": sum(r["skipped"] for r in results.values()),
+        "rejected_503": sum(r["rejected"] for r in results.values()),
+        "errors": sum(r["errors"] for r in results.values()),
+        "latency_ms": summarize(latencies),
+    }
+
+
+# ==================== COMPARE ====================
+def compare_runs(before_path: Path, after_path: Path):
+    before = json.loads(before_path.read_text())
+    after = json.loads(after_path.read_text())
+    print(f"Comparing {before['commit']} ({before_path.name}) -> {after['commit']} ({after_path.name})")
+
+    def delta(old, new):
+        if not old:
+            return "n/a"
+        return f"{(new - old) / old * 100:+.1f}%"
+
+    print("-" * 70)
+    print(f"{'stage':<14} {'p50 before':>12} {'p50 after':>12} {'change':>10}")
+    for stage in STAGES:
+        old = before.get("stages", {}).get(stage, {}).get("p50")
+        new = after.get("stages", {}).get(stage, {}).get("p50")
+        if old is None or new is None:
+            continue
+        print(f"{stage:<14} {old:>12} {new:>12} {delta(old, new):>10}")
+
+    print("-" * 70)
+    print(f"{'clients':<8} {'fps before':>11} {'fps after':>10} {'p99 before':>11} {'p99 after':>10}")
+    old_load = {run["clients"]: run for run in before.get("load", [])}
+    for run in after.get("load", []):
+        old = old_load.get(run["clients"])
+        if old is None:
+            continue
+        print(f"{run['clients']:<8} {old['frames_per_sec']:>11} {run['frames_per_sec']:>10} "
+              f"{old['latency_ms'].get('p99', '-'):>11} {run['latency_ms'].get('p99', '-'):>10}")
+    print("-" * 70)
+
+
+# ==================== MAIN ====================
+def main():
+    parser = argparse.ArgumentParser(description="Detection server benchmark")
+    parser.add_argument("--url", help="benchmark a running server instead of in-process")
+    parser.add_argument("--model", help="weights to load in-process (default: Config.MODEL_FILE)")
+    parser.add_argument("--images", type=Path, default=BACKEND_DIR, help="folder with image*.jpg samples")
+    parser.add_argument("--synthetic", type=int, default=4, help="number of synthetic frames")
+    parser.add_argument("--repeat", type=int, default=5, help="stage timing runs per frame")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per load level")
+    parser.add_argument("--frame-rate", type=float, default=10.0,
+                        help="per-client FRAME_RATE (0 = send back-to-back)")
+    parser.add_argument("--output", type=Path, help="result file (default: benchmark_results/<commit>_<time>.json)")
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_runs(*args.compare)
+        return
+
+    frames = load_sample_frames(args.images) + synthetic_frames(args.synthetic)
+    if not frames:
+        print("No frames to benchmark")
+        sys.exit(1)
+    print(f"🖼️  {len(frames)} frames ({args.synthetic} synthetic)")
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "target": args.url or "in-process",
+        "frame_rate": args.frame_rate,
+        "frames": [name for name, _ in frames],
+    }
+
+    if args.url:
+        make_client = lambda client_id: HttpClient(args.url, client_id)
+    else:
+        import server
+        if args.model:
+            server.config.MODEL_FILE = args.model
+        if not server.initialize_model():
+            print("❌ Failed to initialize model.")
+            sys.exit(1)
+
+        report["config"] = {
+            "model": server.config.MODEL_FILE,
+            "image_size": server.config.IMAGE_SIZE,
+            "max_image_edge": server.config.MAX_IMAGE_EDGE,
+            "batch_max_size": server.config.BATCH_MAX_SIZE,
+            "batch_max_wait_ms": server.config.BATCH_MAX_WAIT_MS,
+            "max_concurrent_clients": server.config.MAX_CONCURRENT_CLIENTS,
+            "adaptive_resolution": server.config.ADAPTIVE_RESOLUTION,
+            "scene_cache_enabled": server.config.SCENE_CACHE_ENABLED,
+            "motion_gate_enabled": server.config.MOTION_GATE_ENABLED,
+            "track_inference_interval": server.config.TRACK_INFERENCE_INTERVAL,
+        }
+
+        print("⏱️  Stage latency...")
+        report["stages"] = benchmark_stages(server, frames, args.repeat)
+        for stage, stats in report["stages"].items():
+            print(f"   {stage:<12} p50 {stats['p50']:>9} ms   p99 {stats['p99']:>9} ms")
+
+        make_client = lambda client_id: InProcessClient(server, client_id)
+
+    report["load"] = []
+    for clients in args.clients:
+        print(f"📈 {clients} clients for {args.duration:.0f}s...")
+        run = benchmark_load(make_client, frames, clients, args.duration, args.frame_rate)
+        report["load"].append(run)
+        latency = run["latency_ms"]
+        print(f"   {run['frames_per_sec']} fps, p50 {latency.get('p50', '-')} ms, "
+              f"p95 {latency.get('p95', '-')} ms, p99 {latency.get('p99', '-')} ms, "
+              f"skipped {run['skipped']}, 503 {run['rejected_503']}, errors {run['errors']}")
+
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"{report['commit']}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.write_text(json.dumps(report, indent=2))
+    print(f"💾 Results written to {output}")
+
+    if not args.url:
+        server.batcher.stop()
+
+
+if __name__ == "__main__":
+    main()
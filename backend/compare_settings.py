@@ -0,0 +1,184 @@
+"""
+Latency / accuracy comparison for the PERFORMANCE TUNING settings in server.py.
+
+Runs the sample images through the same preprocessing and detection path as
+/detect for every combination of IMAGE_SIZE and MAX_IMAGE_EDGE, and compares
+the detections against a full-resolution reference run (imgsz=640, no resize).
+
+Usage:
+  python compare_settings.py
+  python compare_settings.py --sizes 256 320 480 --edges 320 480 640 --repeat 5
+  python compare_settings.py --images C:\\path\\to\\frames --output compare.json
+"""
+
+import argparse
+import io
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import server
+
+REFERENCE_SIZE = 640
+IOU_MATCH = 0.5
+SESSION_ID = "compare-settings"
+
+
+def load_samples(folder: Path) -> list:
+    """Read sample images into memory so disk IO doesn't skew timings."""
+    paths = sorted(p for p in folder.glob("image*.*") if p.suffix.lower() in {".jpg", ".jpeg", ".png"})
+    return [(p.name, p.read_bytes()) for p in paths]
+
+
+def apply_settings(image_size: int, max_edge: int, skip_resize: bool):
+    server.config.IMAGE_SIZE = image_size
+    server.config.MAX_IMAGE_EDGE = max_edge
+    server.config.SKIP_RESIZE = skip_resize
+    server.batcher.predict_kwargs["imgsz"] = image_size
+
+    # Every frame must run YOLO at image_size: repeated images would otherwise
+    # be answered from the scene cache or extrapolated tracks, and adaptive
+    # resolution would pick its own input size
+    server.config.ADAPTIVE_RESOLUTION = False
+    server.config.SCENE_CACHE_ENABLED = False
+    server.config.MOTION_GATE_ENABLED = False
+    server.config.TRACK_INFERENCE_INTERVAL = 1
+    server.sessions.remove(SESSION_ID)  # rebuilt with these settings on the next frame
+
+
+def detect(data: bytes) -> tuple:
+    """Run one frame through /detect's pipeline. Returns (result, preprocess_ms, total_ms)."""
+    start_time = time.perf_counter()
+    img = server.process_image(io.BytesIO(data))
+    preprocess_time = (time.perf_counter() - start_time) * 1000
+    result = server.run_detection(img, server.sessions.get(SESSION_ID))
+    total_time = (time.perf_counter() - start_time) * 1000
+    return result, preprocess_time, total_time
+
+
+def normalized_boxes(result: dict) -> list:
+    """Detections with boxes scaled to 0..1 so different frame sizes can be compared."""
+    w, h = result["frameWidth"], result["frameHeight"]
+    return [
+        (d["class"], d["position"], d["distance"],
+         (d["bbox"]["x1"] / w, d["bbox"]["y1"] / h, d["bbox"]["x2"] / w, d["bbox"]["y2"] / h))
+        for d in result["detections"]
+    ]
+
+
+def iou(a: tuple, b: tuple) -> float:
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, ix2 - ix1) * max(0.0, iy2 - iy1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def compare(reference: list, candidate: list) -> dict:
+    """Greedy same-class IoU matching of candidate detections against the reference."""
+    unmatched = list(candidate)
+    matched = 0
+    same_buckets = 0
+    for ref_class, ref_pos, ref_dist, ref_box in reference:
+        best, best_iou = None, IOU_MATCH
+        for cand in unmatched:
+            if cand[0] != ref_class:
+                continue
+            overlap = iou(ref_box, cand[3])
+            if overlap >= best_iou:
+                best, best_iou = cand, overlap
+        if best is not None:
+            unmatched.remove(best)
+            matched += 1
+            if best[1] == ref_pos and best[2] == ref_dist:
+                same_buckets += 1
+    return {
+        "reference": len(reference),
+        "candidate": len(candidate),
+        "matched": matched,
+        "same_buckets": same_buckets,
+    }
+
+
+def run_setting(samples: list, repeat: int) -> tuple:
+    """Returns ({image: normalized detections}, preprocess timings, total timings, frame sizes)."""
+    detections, preprocess_times, total_times, frame_sizes = {}, [], [], set()
+    for name, data in samples:
+        detect(data)  # warm-up for this size
+        for _ in range(repeat):
+            result, preprocess_time, total_time = detect(data)
+            preprocess_times.append(preprocess_time)
+            total_times.append(total_time)
+        detections[name] = normalized_boxes(result)
+        frame_sizes.add((result["frameWidth"], result["frameHeight"]))
+    return detections, preprocess_times, total_times, frame_sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare IMAGE_SIZE / MAX_IMAGE_EDGE settings")
+    parser.add_argument("--images", type=Path, default=Path(__file__).parent, help="folder with image*.jpg samples")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 320, 416, 480, 640])
+    parser.add_argument("--edges", type=int, nargs="+", default=[320, 480, 640, 960])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per image")
+    parser.add_argument("--model", default=server.config.MODEL_FILE, help="weights to load")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    args = parser.parse_args()
+
+    samples = load_samples(args.images)
+    if not samples:
+        print(f"No image*.jpg samples found in {args.images}")
+        sys.exit(1)
+
+    server.config.MODEL_FILE = args.model
+    if not server.initialize_model():
+        print("❌ Failed to initialize model.")
+        sys.exit(1)
+
+    print(f"🔍 {len(samples)} sample images, {args.repeat} runs each")
+
+    # Reference: largest input size on the full-resolution frame
+    apply_settings(REFERENCE_SIZE, 0, skip_resize=True)
+    reference, _, _, _ = run_setting(samples, 1)
+
+    rows = []
+    for image_size in args.sizes:
+        for max_edge in args.edges:
+            apply_settings(image_size, max_edge, skip_resize=False)
+            detections, preprocess_times, total_times, frame_sizes = run_setting(samples, args.repeat)
+
+            totals = {"reference": 0, "candidate": 0, "matched": 0, "same_buckets": 0}
+            for name, _ in samples:
+                for key, value in compare(reference[name], detections[name]).items():
+                    totals[key] += value
+
+            rows.append({
+                "image_size": image_size,
+                "max_image_edge": max_edge,
+                "frame_sizes": sorted(frame_sizes),
+                "preprocess_ms": round(statistics.median(preprocess_times), 2),
+                "total_ms": round(statistics.median(total_times), 2),
+                "recall": round(totals["matched"] / totals["reference"], 3) if totals["reference"] else 1.0,
+                "precision": round(totals["matched"] / totals["candidate"], 3) if totals["candidate"] else 1.0,
+                "bucket_agreement": round(totals["same_buckets"] / totals["matched"], 3) if totals["matched"] else 1.0,
+            })
+
+    print("-" * 78)
+    print(f"{'imgsz':>6} {'max_edge':>9} {'prep ms':>9} {'total ms':>9} {'recall':>8} {'precision':>10} {'buckets':>8}")
+    print("-" * 78)
+    for row in rows:
+        print(f"{row['image_size']:>6} {row['max_image_edge']:>9} {row['preprocess_ms']:>9} "
+              f"{row['total_ms']:>9} {row['recall']:>8} {row['precision']:>10} {row['bucket_agreement']:>8}")
+    print("-" * 78)
+    print(f"Reference: imgsz={REFERENCE_SIZE}, full resolution. 'buckets' = same position and distance.")
+
+    if args.output:
+        args.output.write_text(json.dumps({"reference_size": REFERENCE_SIZE, "results": rows}, indent=2))
+        print(f"💾 Results written to {args.output}")
+
+    server.batcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""
+Banknote counting for the Mudra screen.
+
+The banknote model's classes are denominations ('10', '500', '100 Rupee',
+...). Their rupee values are parsed once when the model loads, into an array
+indexed by class id, so counting a frame's notes is a couple of NumPy calls
+instead of string parsing per detection.
+
+Tiled mode, for dense piles of notes in a full-resolution photo: the photo is
+split into overlapping tiles that are each run at the model's input size
+(plus one downscaled pass over the whole photo for notes larger than a tile),
+all in one batch. The boxes are mapped back to photo coordinates and merged
+with a greedy NMS across tiles. Besides plain IoU, a box cut off by a tile
+seam is also dropped when it lies mostly inside a box that was kept, since
+the half of a note seen by one tile hardly overlaps the whole note by IoU.
+
+Streaming mode, for a camera panning across notes: CurrencyTally keeps a
+running count per client, placing each note in a frame fixed to the table so
+a note seen again is not counted twice, and skipping YOLO on frames that
+show nothing new. When the pan is lost (fast motion, blur) the remembered
+notes are re-registered from the layout of the next detections before any
+new note is counted.
+"""
+
+import math
+import threading
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from tracking import box_iou
+
+
+# ==================== DENOMINATIONS ====================
+def note_values(names: dict) -> np.ndarray:
+    """Rupee value per class id: the digits in the class name, 0 if it has none."""
+    values = np.zeros(max(names) + 1 if names else 0, dtype=np.int64)
+    for class_id, name in names.items():
+        digits = ''.join(filter(str.isdigit, str(name)))
+        values[class_id] = int(digits) if digits else 0
+    return values
+
+
+def result_arrays(result, conf: float) -> tuple:
+    """(boxes, confidences, class_ids) of one YOLO result, filtered by confidence."""
+    if result.boxes is None or len(result.boxes) == 0:
+        return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+    boxes = result.boxes.xyxy.cpu().numpy()
+    confidences = result.boxes.conf.cpu().numpy()
+    class_ids = result.boxes.cls.cpu().numpy().astype(np.int64)
+    keep = confidences >= conf
+    return boxes[keep], confidences[keep], class_ids[keep]
+
+
+# ==================== TILING ====================
+def tile_windows(width: int, height: int, tile: int, overlap: float) -> list:
+    """
+    (x0, y0, x1, y1) windows of at most tile x tile pixels covering the image,
+    neighbours overlapping by at least the given fraction.
+    """
+    def starts(length: int) -> list:
+        if length <= tile:
+            return [0]
+        count = math.ceil((length - tile) / (tile * (1 - overlap))) + 1
+        return np.linspace(0, length - tile, count).round().astype(int).tolist()
+
+    return [
+        (x, y, min(x + tile, width), min(y + tile, height))
+        for y in starts(height) for x in starts(width)
+    ]
+
+
+def tile_arrays(result, window: tuple, width: int, height: int, conf: float, edge_margin: int) -> tuple:
+    """
+    A tile's boxes in photo coordinates, plus which of them are cut off by a
+    seam (touch a tile edge that is not also the photo's edge).
+    """
+    boxes, confidences, class_ids = result_arrays(result, conf)
+    x0, y0, x1, y1 = window
+    boxes = boxes + np.array([x0, y0, x0, y0], dtype=boxes.dtype)
+    clipped = (
+        ((boxes[:, 0] <= x0 + edge_margin) & (x0 > 0))
+        | ((boxes[:, 1] <= y0 + edge_margin) & (y0 > 0))
+        | ((boxes[:, 2] >= x1 - edge_margin) & (x1 < width))
+        | ((boxes[:, 3] >= y1 - edge_margin) & (y1 < height))
+    )
+    return boxes, confidences, class_ids, clipped
+
+
+def merge_boxes(boxes: np.ndarray, confidences: np.ndarray, clipped: np.ndarray,
+                iou_threshold: float = 0.5, ios_threshold: float = 0.6) -> np.ndarray:
+    """
+    Greedy class-agnostic NMS across tiles. Whole boxes are kept before
+    clipped ones, then by confidence. Returns the indices to keep.
+    """
+    order = np.lexsort((-confidences, clipped))
+    areas = np.maximum(boxes[:, 2] - boxes[:, 0], 0) * np.maximum(boxes[:, 3] - boxes[:, 1], 0)
+    suppressed = np.zeros(len(boxes), dtype=bool)
+    keep = []
+    for i in order:
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        width = np.clip(np.minimum(boxes[i, 2], boxes[:, 2]) - np.maximum(boxes[i, 0], boxes[:, 0]), 0, None)
+        height = np.clip(np.minimum(boxes[i, 3], boxes[:, 3]) - np.maximum(boxes[i, 1], boxes[:, 1]), 0, None)
+        intersection = width * height
+        iou = intersection / np.maximum(areas[i] + areas - intersection, 1e-6)
+        inside = intersection / np.maximum(areas, 1e-6)  # share of each box covered by box i
+        suppressed |= (iou > iou_threshold) | (clipped & (inside > ios_threshold))
+    return np.array(keep, dtype=np.int64)
+
+
+def predict_tiled(batcher, frame: np.ndarray, tile: int, overlap: float, conf: float,
+                  full_size: int = None, iou_threshold: float = 0.5, ios_threshold: float = 0.6) -> tuple:
+    """
+    Run a photo as overlapping tiles (and, with full_size, one whole-photo
+    pass at that input size) in one batch, and merge the boxes.
+    Returns (boxes, confidences, class_ids, tile count, inference time in ms).
+    """
+    height, width = frame.shape[:2]
+    windows = tile_windows(width, height, tile, overlap)
+    images = [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in windows]
+    sizes = [tile] * len(windows)
+    if full_size:
+        images.append(frame)
+        sizes.append(full_size)
+
+    started = time.time()
+    outputs = batcher.submit_many(images, imgsz=sizes)
+    inference_time = (time.time() - started) * 1000
+
+    edge_margin = max(2, tile // 100)
+    parts = [
+        tile_arrays(result, window, width, height, conf, edge_margin)
+        for (result, _, _), window in zip(outputs, windows)
+    ]
+    if full_size:
+        boxes, confidences, class_ids = result_arrays(outputs[-1][0], conf)
+        parts.append((boxes, confidences, class_ids, np.zeros(len(boxes), dtype=bool)))
+
+    boxes, confidences, class_ids, clipped = (np.concatenate(column) for column in zip(*parts))
+    keep = merge_boxes(boxes, confidences, clipped, iou_threshold, ios_threshold)
+    return boxes[keep], confidences[keep], class_ids[keep], len(windows), inference_time
+
+
+# ==================== COUNTING ====================
+def count_notes(boxes: np.ndarray, confidences: np.ndarray, class_ids: np.ndarray,
+                names: dict, values: np.ndarray) -> dict:
+    """Per-denomination counts, total value and the notes themselves."""
+    ids, counts = np.unique(class_ids, return_counts=True)
+    int_boxes = boxes.astype(np.int64)
+    return {
+        **summarize_counts(dict(zip(ids.tolist(), counts.tolist())), names, values),
+        "notes": [
+            {
+                "class": names[c],
+                "value": v,
+                "confidence": round(score, 3),
+                "bbox": {"x1": x1, "y1": y1, "x2": x2, "y2": y2}
+            }
+            for c, v, score, (x1, y1, x2, y2) in zip(
+                class_ids.tolist(), values[class_ids].tolist(), confidences.tolist(), int_boxes.tolist()
+            )
+        ],
+    }
+
+
+def summarize_counts(class_counts: dict, names: dict, values: np.ndarray) -> dict:
+    """Counts by denomination name, per-denomination details and total value from class id -> count."""
+    class_counts = sorted(class_counts.items())
+    return {
+        "counts": {names[c]: n for c, n in class_counts},
+        "denominations": [
+            {"class": names[c], "value": int(values[c]), "count": n} for c, n in class_counts
+        ],
+        "total": int(sum(values[c] * n for c, n in class_counts)),
+    }
+
+
+def describe_notes(denominations: list, total: int) -> str:
+    """Sentence for text-to-speech, e.g. '2 notes of 500 rupees. Total 1000 rupees'."""
+    if not denominations:
+        return "No currency detected"
+    parts = [
+        f"{d['count']} {'note' if d['count'] == 1 else 'notes'} of {d['value'] or d['class']} rupees"
+        for d in denominations
+    ]
+    return f"{', '.join(parts)}. Total {total} rupees"
+
+
+# ==================== STREAMING TALLY ====================
+def match_notes(boxes: np.ndarray, known: np.ndarray, threshold: float, allowed: np.ndarray = None) -> list:
+    """
+    Greedy one-to-one matching of boxes to known boxes, best IoU first.
+    allowed optionally masks out (box, known) pairs. Returns (box, known) index pairs.
+    """
+    if not len(boxes) or not len(known):
+        return []
+    iou = np.array([box_iou(box, known) for box in boxes])
+    if allowed is not None:
+        iou = np.where(allowed, iou, 0.0)
+    pairs = np.argwhere(iou >= threshold)
+    pairs = pairs[np.argsort(-iou[pairs[:, 0], pairs[:, 1]], kind='stable')]
+    matches, used_boxes, used_known = [], set(), set()
+    for i, j in pairs.tolist():
+        if i not in used_boxes and j not in used_known:
+            used_boxes.add(i)
+            used_known.add(j)
+            matches.append((i, j))
+    return matches
+
+
+class _Notes:
+    """World boxes, denominations and confidences of a set of notes."""
+
+    def __init__(self):
+        self.boxes = np.empty((0, 4))
+        self.classes = np.empty(0, dtype=np.int64)
+        self.confidences = np.empty(0)
+        self.last_seen = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.classes)
+
+    def merge(self, world: np.ndarray, confidences: np.ndarray, class_ids: np.ndarray,
+              frame: int, match_iou: float) -> int:
+        """
+        Match boxes to the notes already here and add the rest. Each note
+        matches at most one box, so overlapping notes in one frame all count.
+        Returns how many were added.
+        """
+        matched = np.zeros(len(world), dtype=bool)
+        for i, j in match_notes(world, self.boxes, match_iou):
+            # Same note seen again: refine its box, keep the surest denomination
+            matched[i] = True
+            self.boxes[j] = world[i]
+            self.last_seen[j] = frame
+            if confidences[i] > self.confidences[j]:
+                self.confidences[j] = confidences[i]
+                self.classes[j] = class_ids[i]
+
+        new = ~matched
+        self.boxes = np.vstack([self.boxes, world[new]])
+        self.classes = np.append(self.classes, class_ids[new])
+        self.confidences = np.append(self.confidences, confidences[new])
+        self.last_seen = np.append(self.last_seen, np.full(int(new.sum()), frame))
+        return int(new.sum())
+
+    def remove(self, mask: np.ndarray) -> np.ndarray:
+        """Drop the masked notes. Returns their class ids."""
+        removed = self.classes[mask]
+        keep = ~mask
+        self.boxes = self.boxes[keep]
+        self.classes = self.classes[keep]
+        self.confidences = self.confidences[keep]
+        self.last_seen = self.last_seen[keep]
+        return removed
+
+
+class CurrencyTally:
+    """
+    Running banknote tally for a camera panning across notes.
+
+    The pan between consecutive frames is measured with phase correlation on
+    small grayscale thumbnails and accumulated, so every box can be placed in
+    one "world" frame fixed to the table. A detection that overlaps a note
+    already seen there is the same note and is not counted again. YOLO only
+    runs when the camera has moved far enough to show something new (or
+    every max_skip frames, for notes put down in view). Only the last
+    max_notes notes are kept for matching; older ones stay in the tally.
+
+    If phase correlation loses the pan, the remembered notes are kept and YOLO
+    runs on every frame. Notes seen meanwhile are held back, uncounted, until
+    their layout lines up with the remembered notes (same denominations, same
+    relative positions), which also recovers the offset; then only the ones
+    that don't match are counted. After relocate_attempts frames with notes
+    but no such fit, the held notes are taken to be new.
+    """
+
+    THUMBNAIL_WIDTH = 160
+
+    def __init__(self, coverage: float = 0.25, max_skip: int = 10, match_iou: float = 0.3,
+                 max_notes: int = 64, min_response: float = 0.1, relocate_attempts: int = 5):
+        self.coverage = coverage          # pan, as a share of the frame, that shows new notes
+        self.max_skip = max_skip
+        self.match_iou = match_iou
+        self.max_notes = max_notes
+        self.min_response = min_response  # phase correlation peak below this: pan unknown
+        self.relocate_attempts = relocate_attempts
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._thumbnail = None
+        self._window = None
+        self._scale = 1.0
+        self._frame_size = np.ones(2)
+        self.offset = np.zeros(2)            # accumulated content shift, in frame pixels
+        self._inferred_offset = None         # offset at the last YOLO run
+        self._skipped = 0
+        self._notes = _Notes()               # remembered notes, in world coordinates
+        self._held = _Notes()                # notes seen since the pan was lost, not yet counted
+        self.retired = Counter()             # class id -> notes no longer remembered
+        self.lost = False                    # pan unknown until the notes are re-registered
+        self._failed_relocations = 0
+        self.frames = 0
+        self.inferred = 0
+        self.tracking_lost = 0
+        self.relocated = 0
+
+    def track(self, frame: np.ndarray) -> bool:
+        """
+        Measure the pan since the previous frame and decide whether this frame
+        needs YOLO. Returns True if it does.
+        """
+        height, width = frame.shape[:2]
+        self._frame_size = np.array([width, height], dtype=float)
+        self._scale = width / self.THUMBNAIL_WIDTH
+        size = (self.THUMBNAIL_WIDTH, max(1, round(height / self._scale)))
+        gray = cv2.cvtColor(cv2.resize(frame, size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        thumbnail = gray.astype(np.float32)
+        self.frames += 1
+
+        if self._thumbnail is None or self._thumbnail.shape != thumbnail.shape:
+            self._window = cv2.createHanningWindow(size, cv2.CV_32F)
+        else:
+            (dx, dy), response = cv2.phaseCorrelate(self._thumbnail, thumbnail, self._window)
+            if response < self.min_response:
+                # Lost the pan (fast motion, blur): keep the notes, re-register them in add().
+                # Held notes were placed with the pan before this jump, so start over.
+                if len(self._notes):
+                    if not self.lost:
+                        self.tracking_lost += 1
+                    self.lost = True
+                    self._held = _Notes()
+            else:
+                self.offset += np.array([dx, dy]) * self._scale
+        self._thumbnail = thumbnail
+
+        if not self.lost and self._inferred_offset is not None and self._skipped < self.max_skip:
+            pan = np.abs(self.offset - self._inferred_offset) / np.array([width, height])
+            if pan.max() < self.coverage:
+                self._skipped += 1
+                return False
+        self._inferred_offset = self.offset.copy()
+        self._skipped = 0
+        self.inferred += 1
+        return True
+
+    def add(self, boxes: np.ndarray, confidences: np.ndarray, class_ids: np.ndarray) -> int:
+        """Match a frame's detections to the remembered notes. Returns how many are new."""
+        world = boxes - np.tile(self.offset, 2)
+        if not self.lost:
+            new = self._notes.merge(world, confidences, class_ids, self.frames, self.match_iou)
+        else:
+            # Pan unknown: counting now could count every note on the table again
+            self._held.merge(world, confidences, class_ids, self.frames, self.match_iou)
+            if not len(boxes):
+                return 0
+            shift = self._relocate()
+            if shift is None:
+                self._failed_relocations += 1
+                if self._failed_relocations < self.relocate_attempts:
+                    return 0
+                # Never lined up: the remembered notes are out of view, the held ones are new
+                self.retired.update(self._notes.remove(np.ones(len(self._notes), dtype=bool)).tolist())
+                shift = np.zeros(2)
+            else:
+                self.relocated += 1
+
+            self.offset -= shift
+            self._inferred_offset = self.offset.copy()
+            held, self._held = self._held, _Notes()
+            self.lost = False
+            self._failed_relocations = 0
+            new = self._notes.merge(held.boxes + np.tile(shift, 2), held.confidences, held.classes,
+                                    self.frames, self.match_iou)
+
+        if len(self._notes) > self.max_notes:
+            oldest = np.argsort(self._notes.last_seen, kind='stable')[:len(self._notes) - self.max_notes]
+            stale = np.zeros(len(self._notes), dtype=bool)
+            stale[oldest] = True
+            self.retired.update(self._notes.remove(stale).tolist())
+        return new
+
+    def _relocate(self):
+        """
+        Find the shift that lines the held notes up with the remembered ones
+        (world = held + shift). Every same-denomination pair proposes one; the
+        one matching the most notes wins (ties: the smallest). A single
+        matching note is ambiguous, so it is only trusted for a shift of at
+        most half a frame. Returns the shift, or None.
+        """
+        held, notes = self._held, self._notes
+        same_class = held.classes[:, None] == notes.classes[None, :]
+        centers = (held.boxes[:, :2] + held.boxes[:, 2:]) / 2
+        known_centers = (notes.boxes[:, :2] + notes.boxes[:, 2:]) / 2
+        best, best_shift = (0, 0.0), None
+        for i, j in np.argwhere(same_class).tolist():
+            shift = known_centers[j] - centers[i]
+            count = len(match_notes(held.boxes + np.tile(shift, 2), notes.boxes, self.match_iou, same_class))
+            jump = float(np.max(np.abs(shift) / self._frame_size))
+            if (count, -jump) > best:
+                best, best_shift = (count, -jump), shift
+        count, jump = best[0], -best[1]
+        if count < 1 or (count == 1 and jump > 0.5):
+            return None
+        return best_shift
+
+    def counts(self) -> Counter:
+        """class id -> notes counted so far."""
+        return self.retired + Counter(self._notes.classes.tolist())
@@ -0,0 +1,79 @@
+"""
+Local stand-in for Groq's transcription API, for testing /transcribe offline.
+
+Answers POST /openai/v1/audio/transcriptions with a verbose_json response
+after a configurable delay, and can fail a share of the calls, so slow and
+flaky speech APIs can be reproduced on one machine.
+
+Usage:
+  python fake_speech_api.py --delay 3 --fail-rate 0.2
+  GROQ_API_KEY=test GROQ_BASE_URL=http://localhost:5055 python server.py
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from flask import Flask, jsonify, request
+
+app = Flask(__name__)
+
+settings = {"delay": 0.5, "fail_rate": 0.0, "text": "open netra"}
+calls = {"total": 0, "failed": 0, "active": 0}
+calls_lock = threading.Lock()
+
+
+@app.route('/openai/v1/audio/transcriptions', methods=['POST'])
+def transcriptions():
+    with calls_lock:
+        calls["total"] += 1
+        calls["active"] += 1
+    try:
+        audio = request.files.get('file')
+        size = len(audio.read()) if audio else 0
+        time.sleep(settings["delay"])
+
+        if random.random() < settings["fail_rate"]:
+            with calls_lock:
+                calls["failed"] += 1
+            return jsonify({"error": {"message": "Simulated speech API failure", "type": "server_error"}}), 503
+
+        text = settings["text"]
+        return jsonify({
+            "text": text,
+            "language": request.form.get('language', 'en'),
+            "duration": 1.0,
+            "segments": [{
+                "id": 0, "start": 0.0, "end": 1.0, "text": f" {text}",
+                "avg_logprob": -0.2, "no_speech_prob": 0.01, "compression_ratio": 1.0
+            }],
+            "x_fake": {"bytes_received": size}
+        })
+    finally:
+        with calls_lock:
+            calls["active"] -= 1
+
+
+@app.route('/calls', methods=['GET'])
+def get_calls():
+    with calls_lock:
+        return jsonify(dict(calls))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Groq transcription API")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--delay", type=float, default=0.5, help="seconds before each answer")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of calls answered with a 503")
+    parser.add_argument("--text", default="open netra", help="transcript returned for every call")
+    args = parser.parse_args()
+
+    settings.update(delay=args.delay, fail_rate=args.fail_rate, text=args.text)
+    print(f"🎤 Fake speech API on http://localhost:{args.port} "
+          f"(delay {args.delay}s, fail rate {args.fail_rate:.0%})")
+    app.run(host='0.0.0.0', port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Inference engine for the detection server.
+
+Model backends: the YOLO weights can be served through PyTorch, or exported
+once to ONNX Runtime or OpenVINO IR (usually 2-3x faster on CPU for the nano
+model). The exported artifact is cached next to the weights, and loading falls
+back to PyTorch if the chosen runtime is missing or the export fails.
+
+Batching: Flask serves every request on its own thread. Instead of each thread
+calling ``model.predict`` with a batch of one, request threads hand their frame
+to a single worker thread, which gathers whatever frames are waiting (up to a
+max batch size, or until a few milliseconds have passed) and runs them through
+one batched ``predict`` call. Every caller then gets back its own result.
+Frames may ask for different input sizes; a batch is split into one
+``predict`` call per size.
+"""
+
+import importlib.util
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# backend -> (ultralytics export format, module needed to run it, module needed to export it)
+BACKENDS = {
+    "pytorch": (None, "torch", None),
+    "onnx": ("onnx", "onnxruntime", "onnx"),
+    "openvino": ("openvino", "openvino", "openvino"),
+}
+
+
+# ==================== MODEL BACKENDS ====================
+def exported_model_path(weights: str, backend: str) -> Path:
+    """Where ultralytics writes the exported artifact for these weights."""
+    stem = Path(weights).with_suffix("")
+    if backend == "onnx":
+        return stem.with_suffix(".onnx")
+    if backend == "openvino":
+        return Path(f"{stem}_openvino_model")
+    return Path(weights)
+
+
+def _module_available(name: str) -> bool:
+    return name is None or importlib.util.find_spec(name) is not None
+
+
+def export_model(weights: str, backend: str, imgsz: int) -> Path:
+    """Export weights for a backend, reusing the cached artifact if it is up to date."""
+    export_format, _, export_module = BACKENDS[backend]
+    path = exported_model_path(weights, backend)
+    source = Path(weights)
+
+    if path.exists() and (not source.exists() or path.stat().st_mtime >= source.stat().st_mtime):
+        logger.info(f"✅ Using cached {backend} model: {path}")
+        return path
+
+    if not _module_available(export_module):
+        raise RuntimeError(f"'{export_module}' is not installed, cannot export to {backend}")
+
+    from ultralytics import YOLO
+
+    logger.info(f"🔄 Exporting {weights} to {backend} (first start only)...")
+    start_time = time.time()
+    # dynamic shapes so the batcher can send any batch size and input size
+    exported = YOLO(weights).export(format=export_format, imgsz=imgsz, dynamic=True, verbose=False)
+    logger.info(f"✅ Exported {backend} model in {time.time() - start_time:.1f}s: {exported}")
+    return Path(exported)
+
+
+def load_model(weights: str, backend: str, imgsz: int, device: str) -> tuple:
+    """
+    Load the detector on the requested backend, falling back to PyTorch.
+    Returns (model, backend actually used). Every backend yields the same
+    ultralytics Results, so run_detection does not care which one runs.
+    """
+    from ultralytics import YOLO
+
+    if backend not in BACKENDS:
+        logger.warning(f"⚠️  Unknown inference backend '{backend}', using pytorch")
+        backend = "pytorch"
+
+    candidates = [backend] if backend == "pytorch" else [backend, "pytorch"]
+    last_error = None
+    for name in candidates:
+        try:
+            _, runtime_module, _ = BACKENDS[name]
+            if not _module_available(runtime_module):
+                raise RuntimeError(f"'{runtime_module}' is not installed")
+
+            if name == "pytorch":
+                model = YOLO(weights)
+                model.to(device)
+            else:
+                model = YOLO(str(export_model(weights, name, imgsz)), task="detect")
+                # Load the runtime session now, so a broken runtime falls back here
+                model.predict(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), imgsz=imgsz, verbose=False)
+
+            return model, name
+
+        except Exception as e:
+            last_error = e
+            logger.warning(f"⚠️  Could not load {name} backend: {e}")
+
+    raise last_error
+
+
+# ==================== BATCHED INFERENCE ====================
+class InferenceBatcher:
+    """Gathers frames from many request threads into batched predict calls."""
+
+    def __init__(self, model, max_batch_size: int = 8, max_wait_ms: float = 5.0,
+                 predict_kwargs: dict = None):
+        self.model = model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.predict_kwargs = dict(predict_kwargs or {})
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._running = False
+
+        # Counters for /stats
+        self.batches_run = 0
+        self.frames_run = 0
+
+    def start(self):
+        """Start the inference worker thread."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="inference-batcher", daemon=True)
+        self._thread.start()
+        logger.info(f"✅ Inference batcher started (max batch {self.max_batch_size}, "
+                    f"max wait {self.max_wait * 1000:.1f} ms)")
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the worker thread. Frames still queued get an error."""
+        self._running = False
+        self._queue.put(None)  # wake the worker
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def submit(self, img, timeout: float = None, imgsz: int = None):
+        """
+        Queue a frame and block until its result is ready. imgsz overrides
+        the input size from predict_kwargs for this frame.
+        Returns (result, inference_time_ms, batch_size).
+        """
+        if not self._running:
+            raise RuntimeError("Inference batcher is not running")
+        future = Future()
+        self._queue.put((img, future, imgsz))
+        return future.result(timeout=timeout)
+
+    def submit_many(self, images: list, timeout: float = None, imgsz=None) -> list:
+        """
+        Queue several frames at once so they share a batch, and block until all
+        are done. imgsz is one size for all frames or a list with one per frame.
+        Returns a (result, inference_time_ms, batch_size) tuple per frame.
+        """
+        if not self._running:
+            raise RuntimeError("Inference batcher is not running")
+        sizes = imgsz if isinstance(imgsz, (list, tuple)) else [imgsz] * len(images)
+        futures = []
+        for img, size in zip(images, sizes):
+            future = Future()
+            self._queue.put((img, future, size))
+            futures.append(future)
+        return [future.result(timeout=timeout) for future in futures]
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of frames waiting for the worker."""
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "batches_run": self.batches_run,
+            "frames_run": self.frames_run,
+            "avg_batch_size": round(self.frames_run / self.batches_run, 2) if self.batches_run else 0.0,
+            "queue_depth": self.queue_depth,
+        }
+
+    def _collect(self) -> list:
+        """Block for the first frame, then gather more until the batch is full or the wait expires."""
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self, group: list, imgsz: int = None):
+        """Run one predict call over a group of (frame, future) pairs."""
+        images = [img for img, _ in group]
+        futures = [future for _, future in group]
+        predict_kwargs = dict(self.predict_kwargs)
+        if imgsz is not None:
+            predict_kwargs["imgsz"] = imgsz
+
+        start_time = time.time()
+        try:
+            results = self.model.predict(source=images, **predict_kwargs)
+        except Exception as e:
+            logger.error(f"❌ Batched inference failed ({len(group)} frames): {e}")
+            for future in futures:
+                future.set_exception(e)
+            return
+        inference_time = (time.time() - start_time) * 1000
+
+        self.batches_run += 1
+        self.frames_run += len(group)
+
+        for future, result in zip(futures, results):
+            future.set_result((result, inference_time, len(group)))
+
+    def _worker(self):
+        while self._running:
+            batch = self._collect()
+            if not batch:
+                continue
+
+            # One predict call per input size
+            groups = {}
+            for img, future, imgsz in batch:
+                groups.setdefault(imgsz, []).append((img, future))
+
+            for imgsz, group in groups.items():
+                self._run(group, imgsz)
+
+        # Fail anything left behind so no request thread waits forever
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[1].set_exception(RuntimeError("Inference batcher stopped"))
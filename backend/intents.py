@@ -0,0 +1,77 @@
+"""
+Voice command intent resolver.
+
+Maps a transcribed utterance to one of the app's modes (NETRA, MUDRA, MARGA)
+using the keywords from VOICE_ASSISTANT_SETUP.md. Everything is precompiled
+at import, and resolving is one pass over the utterance's words:
+
+  - exact keyword match, through a word -> intent dict
+  - fuzzy match for the mode names Whisper tends to misspell ("nethra",
+    "mudhra", "marg"): words within one edit of a name. Candidates come from
+    looking up the word and its single-letter deletions in a precomputed
+    deletion table (symmetric delete) and are confirmed with a linear
+    one-edit check, so no full edit-distance matrices
+
+The first keyword in the utterance wins, and exact matches win over fuzzy ones.
+"""
+
+import re
+
+INTENT_KEYWORDS = {
+    'NETRA': ['netra', 'vision', 'detection', 'eye'],
+    'MUDRA': ['mudra', 'currency', 'money', 'finance', 'rupee'],
+    'MARGA': ['marga', 'navigation', 'navigate', 'route', 'direction'],
+}
+
+# Only the mode names are matched fuzzily; common English keywords are
+# transcribed reliably and fuzzing them would catch unrelated words
+FUZZY_NAMES = {'netra': 'NETRA', 'mudra': 'MUDRA', 'marga': 'MARGA'}
+
+WORD_PATTERN = re.compile(r"[a-z]+")
+
+_EXACT = {keyword: intent for intent, keywords in INTENT_KEYWORDS.items() for keyword in keywords}
+
+
+def _deletions(word: str) -> set:
+    """The word itself and every string one deletion away from it."""
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by at most one insertion, deletion or substitution."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+# deletion variant -> mode name, for every fuzzy name
+_FUZZY = {}
+for _name in FUZZY_NAMES:
+    for _variant in _deletions(_name):
+        _FUZZY.setdefault(_variant, _name)
+
+
+def resolve_intent(text: str) -> dict:
+    """
+    Resolve an utterance to {"intent", "keyword", "match"} where match is
+    'exact' or 'fuzzy', or None if no mode was mentioned.
+    """
+    fuzzy = None
+    for word in WORD_PATTERN.findall(text.lower()):
+        intent = _EXACT.get(word)
+        if intent:
+            return {"intent": intent, "keyword": word, "match": "exact"}
+        if fuzzy is None and len(word) >= 4:
+            for variant in _deletions(word):
+                name = _FUZZY.get(variant)
+                if name and _within_one_edit(word, name):
+                    fuzzy = {"intent": FUZZY_NAMES[name], "keyword": word, "match": "fuzzy"}
+                    break
+    return fuzzy
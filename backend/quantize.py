@@ -0,0 +1,115 @@
+"""
+INT8 quantization of the exported ONNX detector, with an accuracy guardrail.
+
+The ONNX model is statically quantized with ONNX Runtime (per-channel INT8
+weights, UINT8 activations), calibrated on sample frames preprocessed exactly
+like ultralytics does at inference. The detection head (box decoding, class
+scores) stays in FP32: its outputs mix pixel coordinates and probabilities in
+one tensor, which a single INT8 scale cannot represent well.
+
+Before the server accepts the quantized model, compare_detections() runs both
+models over sample frames kept out of calibration and reports how many FP32
+detections the INT8 model reproduces with the same class, position and
+distance bucket, overall and for the priority (safety alert) classes.
+"""
+
+import logging
+import re
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def quantized_model_path(onnx_path) -> Path:
+    path = Path(onnx_path)
+    return path.with_name(f"{path.stem}_int8.onnx")
+
+
+def preprocess(frame: np.ndarray, imgsz: int) -> np.ndarray:
+    """BGR frame -> 1x3xHxW float input, letterboxed like ultralytics does for ONNX."""
+    from ultralytics.data.augment import LetterBox
+
+    img = LetterBox(new_shape=(imgsz, imgsz), auto=False)(image=frame)
+    img = img[..., ::-1].transpose(2, 0, 1)  # BGR HWC -> RGB CHW
+    return np.ascontiguousarray(img, dtype=np.float32)[None] / 255.0
+
+
+def _head_nodes(model) -> list:
+    """Names of the nodes in the last module (the Detect head)."""
+    indices = [int(m.group(1)) for node in model.graph.node if (m := re.match(r"/model\.(\d+)/", node.name))]
+    if not indices:
+        return []
+    prefix = f"/model.{max(indices)}/"
+    return [node.name for node in model.graph.node if node.name.startswith(prefix)]
+
+
+def quantize_model(onnx_path, frames: list, imgsz: int) -> Path:
+    """Quantize an ONNX model to INT8, reusing the cached result if it is up to date."""
+    import onnx
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                          quantize_static)
+
+    source = Path(onnx_path)
+    path = quantized_model_path(source)
+    if path.exists() and path.stat().st_mtime >= source.stat().st_mtime:
+        logger.info(f"✅ Using cached INT8 model: {path}")
+        return path
+    if not frames:
+        raise RuntimeError("No calibration frames for INT8 quantization")
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self._inputs = iter([{"images": preprocess(frame, imgsz)} for frame in frames])
+
+        def get_next(self):
+            return next(self._inputs, None)
+
+    model = onnx.load(str(source))
+    logger.info(f"🔄 Quantizing {source} to INT8 on {len(frames)} calibration frames...")
+    quantize_static(
+        str(source), str(path), FrameReader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        nodes_to_exclude=_head_nodes(model)
+    )
+
+    # ultralytics reads class names, stride and imgsz from the model metadata
+    quantized = onnx.load(str(path))
+    if not quantized.metadata_props:
+        quantized.metadata_props.extend(model.metadata_props)
+        onnx.save(quantized, str(path))
+
+    logger.info(f"✅ INT8 model saved: {path} ({path.stat().st_size / 1e6:.1f} MB, "
+                f"FP32 {source.stat().st_size / 1e6:.1f} MB)")
+    return path
+
+
+def compare_detections(reference: list, candidate: list, priority_classes: set) -> dict:
+    """
+    Compare per-frame detections of the FP32 (reference) and INT8 (candidate)
+    models. Each detection is a (class, position, distance) tuple; a reference
+    detection counts as matched when the candidate has the same tuple.
+    """
+    matched = total = priority_matched = priority_total = extra = 0
+    for ref, cand in zip(reference, candidate):
+        ref_counts, cand_counts = Counter(ref), Counter(cand)
+        common = ref_counts & cand_counts
+        matched += sum(common.values())
+        total += sum(ref_counts.values())
+        extra += sum((cand_counts - ref_counts).values())
+        priority_matched += sum(n for det, n in common.items() if det[0] in priority_classes)
+        priority_total += sum(n for det, n in ref_counts.items() if det[0] in priority_classes)
+
+    return {
+        "frames": len(reference),
+        "reference_detections": total,
+        "match_rate": round(matched / total, 4) if total else None,
+        "priority_detections": priority_total,
+        "priority_recall": round(priority_matched / priority_total, 4) if priority_total else None,
+        "extra_detections": extra,
+    }
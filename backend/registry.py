@@ -0,0 +1,217 @@
+"""
+Model registry for the detection server.
+
+One process serves several YOLO models (obstacles for Netra, banknotes for
+Mudra, ...). Each is registered by name with a loader, loaded on first use
+and then kept resident with its own inference batcher. When the resident
+models together exceed the memory budget, the least recently used ones are
+unloaded again; pinned models (the obstacle detector behind /detect) never
+are. Requests hold a model (acquire / release) while they use it, and an
+evicted model is only closed once the last of them has released it. Sizes are estimated from the weights: parameter and buffer bytes for
+PyTorch models, the exported file size for ONNX Runtime / OpenVINO.
+"""
+
+import gc
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def model_size_mb(model, backend: str, artifact: Path) -> float:
+    """Approximate resident size of a loaded model, in MB."""
+    if backend == "pytorch":
+        tensors = list(model.model.parameters()) + list(model.model.buffers())
+        size = sum(t.numel() * t.element_size() for t in tensors)
+    elif artifact.is_dir():
+        size = sum(f.stat().st_size for f in artifact.rglob("*") if f.is_file())
+    else:
+        size = artifact.stat().st_size
+    return size / (1024 * 1024)
+
+
+class ServedModel:
+    """A loaded model with its batcher and per-class lookups."""
+
+    def __init__(self, model, batcher, backend: str, size_mb: float, lookup: dict = None):
+        self.model = model
+        self.batcher = batcher
+        self.backend = backend
+        self.size_mb = size_mb
+        self.lookup = lookup or {}  # per-class data computed once at load
+        self.users = 0              # requests currently holding the model
+        self._retired = False       # evicted, close when the last user releases it
+        self._lock = threading.Lock()
+
+    @property
+    def names(self) -> dict:
+        return self.model.names
+
+    def acquire(self):
+        with self._lock:
+            self.users += 1
+
+    def release(self):
+        """Done with the model; closes it if it was evicted meanwhile."""
+        with self._lock:
+            self.users -= 1
+            idle = self._retired and self.users == 0
+        if idle:
+            self._close()
+
+    def close(self):
+        """Stop the batcher and drop the model, now if idle, else after the last release()."""
+        with self._lock:
+            self._retired = True
+            idle = self.users == 0
+        if idle:
+            self._close()
+
+    def _close(self):
+        if self.batcher is not None:
+            self.batcher.stop()
+        self.batcher = None
+        self.model = None
+
+
+class _Entry:
+    def __init__(self, loader, pinned: bool):
+        self.loader = loader
+        self.pinned = pinned
+        self.served = None
+        self.lock = threading.Lock()  # one load at a time per model
+        self.last_used = 0.0
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+
+class ModelRegistry:
+    """Thread-safe name -> model map, loaded lazily and bounded by a memory budget."""
+
+    def __init__(self, budget_mb: float = 512.0):
+        self.budget_mb = budget_mb
+        self._entries = {}
+        self._resident = OrderedDict()  # name -> ServedModel, least recently used first
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader, pinned: bool = False):
+        """Make a model available under a name. loader() returns a ServedModel."""
+        with self._lock:
+            self._entries[name] = _Entry(loader, pinned)
+
+    def add(self, name: str, served: ServedModel, pinned: bool = True):
+        """Register a model that is already loaded (e.g. the detector at startup)."""
+        with self._lock:
+            entry = self._entries.get(name) or _Entry(None, pinned)
+            entry.pinned = pinned
+            entry.served = served
+            entry.loads += 1
+            entry.last_used = time.time()
+            self._entries[name] = entry
+            self._resident[name] = served
+            self._resident.move_to_end(name)
+        self._enforce_budget(keep=name)
+
+    def names(self) -> list:
+        with self._lock:
+            return sorted(self._entries)
+
+    def get(self, name: str, hold: bool = False) -> ServedModel:
+        """
+        Return the named model, loading it first if needed. KeyError for
+        unknown names. With hold, the caller must release() it when done.
+        """
+        with self._lock:
+            entry = self._entries[name]
+            served = self._touch(name, entry, hold)
+        if served is not None:
+            return served
+
+        with entry.lock:
+            # Another request may have loaded it while this one waited
+            with self._lock:
+                served = self._touch(name, entry, hold)
+            if served is not None:
+                return served
+
+            if entry.loader is None:
+                raise KeyError(name)
+            started = time.time()
+            served = entry.loader()
+            with self._lock:
+                entry.served = served
+                entry.loads += 1
+                entry.last_used = time.time()
+                self._resident[name] = served
+                if hold:
+                    served.acquire()
+            logger.info(f"✅ Model '{name}' loaded in {time.time() - started:.1f}s "
+                        f"({served.backend}, ~{served.size_mb:.0f} MB)")
+
+        self._enforce_budget(keep=name)
+        return served
+
+    def acquire(self, name: str) -> ServedModel:
+        """get() for a request: the model stays usable, even if evicted, until its release()."""
+        return self.get(name, hold=True)
+
+    def _touch(self, name: str, entry: _Entry, hold: bool = False):
+        """Count a hit and mark as most recently used, if resident. Caller holds the lock."""
+        if entry.served is None:
+            return None
+        entry.hits += 1
+        entry.last_used = time.time()
+        self._resident.move_to_end(name)
+        if hold:
+            entry.served.acquire()
+        return entry.served
+
+    def _enforce_budget(self, keep: str):
+        """Unload least recently used models until the resident ones fit the budget."""
+        evicted = []
+        with self._lock:
+            total = sum(served.size_mb for served in self._resident.values())
+            for name in list(self._resident):
+                if total <= self.budget_mb:
+                    break
+                entry = self._entries[name]
+                if entry.pinned or name == keep:
+                    continue
+                served = self._resident.pop(name)
+                entry.served = None
+                entry.evictions += 1
+                total -= served.size_mb
+                evicted.append((name, served))
+
+        for name, served in evicted:
+            served.close()
+            logger.info(f"♻️  Model '{name}' unloaded to stay within {self.budget_mb:.0f} MB")
+        if evicted:
+            gc.collect()
+
+    def stats(self) -> dict:
+        with self._lock:
+            models = {
+                name: {
+                    "loaded": entry.served is not None,
+                    "pinned": entry.pinned,
+                    "size_mb": round(entry.served.size_mb, 1) if entry.served is not None else None,
+                    "hits": entry.hits,
+                    "loads": entry.loads,
+                    "evictions": entry.evictions,
+                }
+                for name, entry in sorted(self._entries.items())
+            }
+            resident_mb = sum(served.size_mb for served in self._resident.values())
+        return {
+            "budget_mb": self.budget_mb,
+            "resident_mb": round(resident_mb, 1),
+            "hits": sum(m["hits"] for m in models.values()),
+            "loads": sum(m["loads"] for m in models.values()),
+            "evictions": sum(m["evictions"] for m in models.values()),
+            "models": models,
+        }
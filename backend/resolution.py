@@ -0,0 +1,119 @@
+"""
+Adaptive input resolution for /detect.
+
+The server watches its own load (time a frame spends waiting for and running
+through the batcher, smoothed, plus the batcher's queue depth) and moves
+along a ladder of YOLO input sizes: down a rung when frames take longer than
+the latency target or the queue backs up, up a rung when there is plenty of
+headroom, but never above max_size (the tuned Config.IMAGE_SIZE by default).
+So under overload the answers get coarser instead of later.
+
+Each response also carries hints for the phone: the JPEG quality that suits
+the current rung, and how long to wait between frames. While frames are too
+slow or the queue is backed up, the recommended interval grows with the
+overload so clients throttle themselves until a smaller rung catches up.
+"""
+
+import threading
+import time
+
+
+class ResolutionController:
+    """Picks the YOLO input size per request from the current load."""
+
+    def __init__(self, ladder: list, start_size: int, max_size: int = None, target_ms: float = 150.0,
+                 headroom: float = 0.5, step_interval: float = 2.0, smoothing: float = 0.2,
+                 frame_interval_ms: float = 100.0, max_frame_interval_ms: float = 1000.0,
+                 max_queue_depth: int = 8):
+        # ladder: (input size, JPEG quality) pairs, largest first, none above max_size
+        ladder = sorted(ladder, key=lambda rung: rung[0], reverse=True)
+        if max_size is not None:
+            ladder = [rung for rung in ladder if rung[0] <= max_size] or ladder[-1:]
+        self.ladder = ladder
+        sizes = [size for size, _ in self.ladder]
+        self.level = min(range(len(sizes)), key=lambda i: abs(sizes[i] - start_size))
+        self.target_ms = target_ms
+        self.headroom = headroom            # step up only below target_ms * headroom
+        self.step_interval = step_interval  # seconds between two steps, so one spike moves one rung
+        self.smoothing = smoothing
+        self.frame_interval_ms = frame_interval_ms
+        self.max_frame_interval_ms = max_frame_interval_ms
+        self.max_queue_depth = max_queue_depth
+
+        self.latency_ms = None  # smoothed wait + inference time
+        self.queue_depth = 0
+        self.steps_down = 0
+        self.steps_up = 0
+        self._last_step = None  # the first observation starts the step interval
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """Input size of the current rung."""
+        return self.ladder[self.level][0]
+
+    def input_size(self, frame_shape: tuple) -> int:
+        """
+        Input size for one frame: the current rung, or a smaller rung if the
+        frame itself is smaller (upscaling a small frame only costs time).
+        """
+        longest = max(frame_shape[:2])
+        with self._lock:
+            size = self.size
+            for rung, _ in self.ladder[self.level:]:
+                if rung >= longest:
+                    size = rung
+            return size
+
+    def observe(self, latency_ms: float, queue_depth: int, now: float = None):
+        """Record one YOLO run and move along the ladder if needed."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self.latency_ms is None:
+                self.latency_ms = latency_ms
+            else:
+                self.latency_ms += self.smoothing * (latency_ms - self.latency_ms)
+            self.queue_depth = queue_depth
+
+            if self._last_step is None:
+                self._last_step = now
+            if now - self._last_step < self.step_interval:
+                return
+            overloaded = self.latency_ms > self.target_ms or queue_depth > self.max_queue_depth
+            if overloaded and self.level < len(self.ladder) - 1:
+                self.level += 1
+                self.steps_down += 1
+                self._last_step = now
+            elif (not overloaded and self.level > 0 and queue_depth == 0
+                  and self.latency_ms < self.target_ms * self.headroom):
+                self.level -= 1
+                self.steps_up += 1
+                self._last_step = now
+
+    def hints(self) -> dict:
+        """Client hints: frame interval (ms) and JPEG quality (0-1)."""
+        with self._lock:
+            # Overloaded (at any rung, e.g. while waiting to step down): ask for fewer frames
+            overload = max(
+                (self.latency_ms or 0.0) / self.target_ms,
+                self.queue_depth / self.max_queue_depth if self.max_queue_depth else 0.0
+            )
+            interval = self.frame_interval_ms
+            if overload > 1:
+                interval = min(self.max_frame_interval_ms, interval * overload)
+            return {
+                "frameIntervalMs": round(interval),
+                "jpegQuality": self.ladder[self.level][1],
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "input_size": self.size,
+                "ladder": [size for size, _ in self.ladder],
+                "latency_ms": round(self.latency_ms, 2) if self.latency_ms is not None else None,
+                "target_ms": self.target_ms,
+                "queue_depth": self.queue_depth,
+                "steps_down": self.steps_down,
+                "steps_up": self.steps_up,
+            }
@@ -0,0 +1,92 @@
+"""
+Static-scene cache and motion gate for the detection server.
+
+A user standing still sends near-identical frames. Each session keeps a tiny
+grayscale thumbnail of the last frame YOLO actually ran on, together with
+that frame's detections. Comparing a new frame's thumbnail with it (mean
+absolute difference in gray levels) is the first, nearly free stage of a
+cascade in front of YOLO:
+
+  - barely changed: reuse the cached detections
+  - changed a little, and the phone's motion hint (if sent) is low:
+    extrapolate the session's tracks
+  - otherwise: run YOLO
+
+However static the scene, YOLO runs again after max_stale_frames skipped
+frames or max_stale_age seconds, so a new hazard is never missed for long.
+"""
+
+import threading
+
+import cv2
+import numpy as np
+
+THUMBNAIL_SIZE = (32, 24)  # width, height: enough to see a person walk in, cheap to compare
+
+
+def scene_thumbnail(frame: np.ndarray) -> np.ndarray:
+    """Tiny grayscale version of a BGR frame, as float32."""
+    small = cv2.resize(frame, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+
+def scene_difference(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean absolute difference between two thumbnails, in gray levels (0-255)."""
+    return float(np.mean(np.abs(a - b)))
+
+
+class SceneCache:
+    """
+    The last inferred frame of one session and its detections, and the
+    cascade gate that decides whether the next frame needs YOLO at all.
+    A threshold of None turns its stage off.
+    """
+
+    def __init__(self, threshold: float = 3.0, change_threshold: float = None,
+                 motion_threshold: float = None, max_stale_frames: int = 5,
+                 max_stale_age: float = 2.0):
+        self.threshold = threshold                # reuse below this difference
+        self.change_threshold = change_threshold  # extrapolate tracks below this difference
+        self.motion_threshold = motion_threshold  # phone motion hint that always forces YOLO
+        self.max_stale_frames = max_stale_frames
+        self.max_stale_age = max_stale_age
+        self._thumbnail = None
+        self._detections = None
+        self._stored_at = 0.0
+        self._skipped = 0  # frames answered without YOLO since the last store
+        self._lock = threading.Lock()
+
+    def gate(self, thumbnail: np.ndarray, now: float, motion: float = None) -> tuple:
+        """
+        Decide how to answer a frame: 'reuse' (the cached detections) if the
+        scene is unchanged, 'extrapolate' if it changed a little and the phone
+        isn't moving fast, else 'infer'. Returns (stage, detections, seconds
+        since the last YOLO run). YOLO runs at least every max_stale_frames
+        frames and every max_stale_age seconds.
+        """
+        with self._lock:
+            if self._thumbnail is None:
+                return 'infer', None, 0.0
+            age = now - self._stored_at
+            if self._skipped >= self.max_stale_frames or age >= self.max_stale_age:
+                return 'infer', None, 0.0
+
+            difference = scene_difference(self._thumbnail, thumbnail)
+            if self.threshold is not None and difference <= self.threshold:
+                self._skipped += 1
+                return 'reuse', self._detections, age
+
+            if self.change_threshold is None or difference > self.change_threshold:
+                return 'infer', None, 0.0
+            if self.motion_threshold is not None and motion is not None and motion > self.motion_threshold:
+                return 'infer', None, 0.0
+            self._skipped += 1
+            return 'extrapolate', None, age
+
+    def store(self, thumbnail: np.ndarray, detections, now: float):
+        """Remember the frame YOLO just ran on and its detections."""
+        with self._lock:
+            self._thumbnail = thumbnail
+            self._detections = detections
+            self._stored_at = now
+            self._skipped = 0
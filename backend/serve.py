@@ -0,0 +1,221 @@
+"""
+Multi-process production entry point for the detection server.
+
+`python server.py` runs one process, so multipart parsing, JPEG decode,
+post-processing and JSON encoding of every request share one GIL. This script
+runs N worker processes instead, all accepting on one listening socket:
+
+  - the models (the detector and Config.PRELOAD_MODELS) are loaded once in
+    the supervisor, before forking, and gc.freeze() keeps the garbage
+    collector from touching (and so copying) the preloaded objects, so
+    workers share the weights copy-on-write
+  - each worker limits torch/OpenCV to its share of the cores, so N workers
+    don't oversubscribe the CPU
+  - this mode always serves with the PyTorch backend: ONNX Runtime and
+    OpenVINO sessions own thread pools that do not survive a fork, so every
+    worker would have to load its own copy
+  - threads (inference batcher, request threads) only start after the fork
+  - the supervisor restarts workers that crash
+
+Per-client state (alert cooldowns, tracks, admission) lives in the worker that
+serves the connection. Phones keep one keep-alive connection, and socket.io
+clients should use the websocket transport, so a client normally sticks to one
+worker.
+
+On a GPU each worker loads its own copy, since CUDA cannot be initialized
+before forking. Platforms without os.fork (Windows) fall back to the
+single-process server.
+
+Usage:
+  python serve.py
+  python serve.py --workers 4 --port 5000
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+import torch
+
+import server
+from server import config
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== WORKER ====================
+def worker_main(listen_socket: socket.socket, threads: int):
+    """Serve requests from the shared socket. Runs in a forked child."""
+    from werkzeug.serving import make_server
+
+    # Ctrl+C reaches the whole process group; the supervisor shuts workers down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    torch.set_num_threads(threads)
+    cv2.setNumThreads(threads)
+
+    # On CUDA the supervisor did not load the model
+    if server.model is None and not server.load_detector():
+        logger.error(f"❌ Worker {os.getpid()} could not load the model")
+        os._exit(1)
+    server.start_batcher()
+    if not server.warm_up():
+        os._exit(1)
+    threading.Thread(target=server.warm_up_speech, name="speech-loader", daemon=True).start()
+    threading.Thread(target=server.preload_models, name="model-preloader", daemon=True).start()
+
+    host, port = listen_socket.getsockname()[:2]
+    httpd = make_server(host, port, server.app, threaded=True, fd=listen_socket.fileno())
+    print(f"✅ Worker {os.getpid()} serving ({server.inference_backend}, {threads} threads)", flush=True)
+    httpd.serve_forever()
+
+
+# ==================== SUPERVISOR ====================
+def preload_model() -> bool:
+    """Load the model once in the supervisor so workers share it copy-on-write."""
+    if server.select_device() == 'cuda':
+        # A CUDA context cannot be used across fork; each worker loads its own
+        return True
+
+    # Keep torch on one thread until the fork: an OpenMP thread pool that
+    # already exists in the parent is not usable in the children
+    torch.set_num_threads(1)
+    if not server.load_detector():
+        return False
+
+    # Run one frame now so the fused model is built once and shared
+    server.model.predict(
+        np.zeros((config.IMAGE_SIZE, config.IMAGE_SIZE, 3), dtype=np.uint8),
+        imgsz=config.IMAGE_SIZE, verbose=False
+    )
+
+    # The workers' registries pick these up instead of loading their own copy
+    if 'currency' in config.PRELOAD_MODELS and os.path.exists(config.CURRENCY_MODEL_FILE):
+        try:
+            server.share_weights(config.CURRENCY_MODEL_FILE, config.CURRENCY_IMAGE_SIZE)
+        except Exception as e:
+            logger.warning(f"⚠️  Could not preload the currency model: {e}")
+
+    gc.collect()
+    gc.freeze()
+    return True
+
+
+def spawn_worker(listen_socket: socket.socket, threads: int) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            worker_main(listen_socket, threads)
+        except Exception as e:
+            logger.error(f"❌ Worker {os.getpid()} crashed: {e}")
+        finally:
+            os._exit(1)
+    return pid
+
+
+def supervise(listen_socket: socket.socket, workers: int, threads: int):
+    """Start the workers and restart any that exit until told to stop."""
+    children = set()
+    stopping = False
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    for _ in range(workers):
+        children.add(spawn_worker(listen_socket, threads))
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if stopping:
+            continue
+
+        logger.error(f"❌ Worker {pid} exited (status {status}), restarting in "
+                     f"{config.WORKER_RESTART_DELAY:.1f}s")
+        time.sleep(config.WORKER_RESTART_DELAY)
+        if not stopping:
+            children.add(spawn_worker(listen_socket, threads))
+
+    print("\n👋 All workers stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process detection server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=config.WORKERS,
+                        help="worker processes (0 = one per CPU core)")
+    parser.add_argument("--threads", type=int, default=config.THREADS_PER_WORKER,
+                        help="torch/OpenCV threads per worker (0 = cores / workers)")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    workers = args.workers if args.workers > 0 else cores
+    threads = args.threads if args.threads > 0 else max(1, cores // workers)
+
+    print("\n" + "="*60)
+    print("🚀 VISUAL ASSISTANCE DETECTION SERVER (multi-process)")
+    print("="*50 + "\n")
+
+    if not hasattr(os, "fork"):
+        print("ℹ️  os.fork is not available on this platform, running a single process")
+        if not server.initialize_model():
+            print("\n❌ Failed to initialize model. Exiting.")
+            sys.exit(1)
+        server.socketio.run(server.app, host=args.host, port=args.port, debug=False,
+                            allow_unsafe_werkzeug=True)
+        return
+
+    # Shared copy-on-write weights and torch.set_num_threads bound memory and
+    # threads across workers; ONNX Runtime / OpenVINO would need a copy each
+    if config.INFERENCE_BACKEND != 'pytorch':
+        print(f"ℹ️  Multi-process mode serves with the pytorch backend (configured: {config.INFERENCE_BACKEND})")
+        config.INFERENCE_BACKEND = 'pytorch'
+
+    if not preload_model():
+        print("\n❌ Failed to initialize model. Exiting.")
+        sys.exit(1)
+
+    # One listening socket, inherited by every worker; the kernel spreads
+    # incoming connections across the processes blocked in accept()
+    listen_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listen_socket.bind((args.host, args.port))
+    listen_socket.listen(128)
+    listen_socket.set_inheritable(True)
+
+    print("📡 Server Configuration:")
+    print(f"   • Address: {args.host}:{args.port}")
+    print(f"   • Workers: {workers} x {threads} threads")
+    print(f"   • Model: {config.MODEL_FILE} ({server.inference_backend or config.INFERENCE_BACKEND})")
+    print(f"   • Device: {server.device.upper()}")
+    print(f"   • Startup: {server.startup_timings}")
+    print("="*50 + "\n")
+
+    supervise(listen_socket, workers, threads)
+    listen_socket.close()
+
+
+if __name__ == "__main__":
+    main()
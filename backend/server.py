@@ -1,24 +1,45 @@
 import io
 import time
+IMPORT_START = time.time()  # startup timings start before the heavy imports
 import logging
-from collections import defaultdict
+import threading
+import math
+from collections import deque
 from datetime import datetime
 import os
+from pathlib import Path
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from ultralytics import YOLO
+from flask_socketio import SocketIO, emit
 from PIL import Image
-import torch
+import cv2
 import numpy as np
-from groq import Groq
 from dotenv import load_dotenv
+
+from inference import InferenceBatcher, exported_model_path, load_model
+from quantize import compare_detections, quantize_model, quantized_model_path
+from audio import SAMPLE_RATE, decode_audio, trim_silence
+from speech import (LOW_CONFIDENCE_LOGPROB, GroqBackend, LocalWhisperBackend, TranscriptCache,
+                    TranscriptionBackend, TranscriptionQueue, audio_key, noise_reason)
+from intents import resolve_intent
+from currency import (CurrencyTally, count_notes, describe_notes, note_values, predict_tiled,
+                      result_arrays, summarize_counts)
+from admission import AdmissionController, Overloaded
+from sessions import Session, SessionStore
+from tracking import Tracker
+from scene import SceneCache, scene_thumbnail
+from registry import ModelRegistry, ServedModel, model_size_mb
+from resolution import ResolutionController
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
+# Threading mode (simple-websocket) so stream workers share the inference batcher
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading", max_http_buffer_size=4 * 1024 * 1024)
 load_dotenv()
-# Initialize Groq client (make sure to set GROQ_API_KEY environment variable)
-groq_client = Groq(api_key=os.getenv('GROQ_API_KEY'))
+# Speech backend is created on first use (Groq needs GROQ_API_KEY), see get_speech_backend
+speech_backend = None
+speech_backend_lock = threading.Lock()
 
 # Configure logging (reduced for performance)
 logging.basicConfig(
@@ -30,6 +51,9 @@ logger = logging.getLogger(__name__)
 # ==================== CONFIGURATION ====================
 class Config:
     MODEL_FILE = 'yolo11n.pt'  # YOLOv11 Nano model
+    # 'pytorch', 'onnx' or 'openvino'. ONNX/OpenVINO models are exported from
+    # MODEL_FILE on first start and cached; falls back to pytorch on failure.
+    INFERENCE_BACKEND = 'onnx'
     COOLDOWN_TIME = 3.0  # Seconds between same alerts
     CONFIDENCE_THRESHOLD = 0.5
 
@@ -66,187 +90,731 @@ class Config:
     # Fallback if class not in list above
     DEFAULT_THRESHOLD = 0.15
 
+    # --- INT8 QUANTIZATION (onnx backend, CPU) ---
+    USE_INT8 = False                  # quantize the ONNX model; kept only if it passes the check below
+    INT8_CALIBRATION_IMAGES = 'image*.jpg'  # sample frames (next to server.py) for calibration and the accuracy check
+    INT8_HOLDOUT_EVERY = 2            # every Nth sample frame is kept out of calibration to check accuracy on
+    INT8_MIN_MATCH_RATE = 0.90        # share of FP32 detections (class, position, distance) INT8 must reproduce
+    INT8_MIN_PRIORITY_RECALL = 1.0    # same, for PRIORITY_OBJECTS only
+
     # --- PERFORMANCE TUNING (KEPT INTACT) ---
     IMAGE_SIZE = 320          # YOLO input size (reduced for speed)
     MAX_IMAGE_EDGE = 480      # downscale very large images (reduced)
-    USE_HALF = True           # fp16 on GPU for speed
+    USE_HALF = True           # fp16 on GPU for speed (ignored on CPU)
     MAX_DETECTIONS = 8        # limit detections returned
     SKIP_RESIZE = False       # Skip expensive resize operations
+    INFER_ON_UNROTATED = False  # True: YOLO on the sideways sensor frame, boxes rotated after (not rotation invariant)
+
+    # --- CURRENCY (Mudra) ---
+    CURRENCY_MODEL_FILE = 'best.pt'  # banknote model, classes named by denomination
+    CURRENCY_CONFIDENCE = 0.6        # 60% sure or don't speak
+    CURRENCY_IMAGE_SIZE = 640        # notes are read from still photos, keep the detail
+    CURRENCY_MAX_IMAGE_EDGE = 1280   # downscale larger photos while decoding
+    CURRENCY_TILED = False           # tiled mode by default (clients can also send tiled=true)
+    CURRENCY_TILE_SIZE = 640         # tile edge in photo pixels, also the input size of each tile
+    CURRENCY_TILE_OVERLAP = 0.2      # share of a tile that overlaps its neighbour
+    CURRENCY_TILE_FULL_PASS = True   # also run the whole photo, for notes larger than a tile
+    CURRENCY_NMS_IOU = 0.5           # cross-tile NMS threshold
+
+    # --- CURRENCY STREAMING (Mudra panning) ---
+    CURRENCY_STREAM_MAX_IMAGE_EDGE = 640  # stream frames are small, many of them
+    CURRENCY_STREAM_COVERAGE = 0.25  # pan (share of the frame) before YOLO runs again
+    CURRENCY_STREAM_MAX_SKIP = 10    # ...or after this many frames, for notes put down in view
+    CURRENCY_STREAM_MATCH_IOU = 0.3  # overlap with a remembered note that makes it the same note
+    CURRENCY_STREAM_MAX_NOTES = 64   # notes remembered per client for de-duplication
+    CURRENCY_STREAM_RELOCATE_ATTEMPTS = 5  # frames to re-find remembered notes after losing the pan
+
+    # --- MODEL REGISTRY ---
+    MODEL_MEMORY_BUDGET_MB = 512     # resident models beyond this are unloaded, least recently used first
+    PRELOAD_MODELS = ['currency']    # loaded at startup instead of on their first request
+
+    # --- ADAPTIVE RESOLUTION ---
+    ADAPTIVE_RESOLUTION = True     # trade input size for latency under load
+    RESOLUTION_LADDER = [(640, 0.4), (480, 0.25), (320, 0.15), (256, 0.1)]  # (input size, client JPEG quality)
+    RESOLUTION_MAX_SIZE = None     # largest size the ladder steps up to, None = IMAGE_SIZE
+    TARGET_LATENCY_MS = 150        # batcher wait + inference above this steps down a size
+    RESOLUTION_STEP_INTERVAL = 2.0 # seconds between two steps on the ladder
+    FRAME_INTERVAL_MS = 100        # frame interval recommended to clients (10 FPS)
+    MAX_FRAME_INTERVAL_MS = 1000   # longest interval recommended under overload
+
+    # --- BATCHED INFERENCE ---
+    BATCH_MAX_SIZE = 8        # max frames per predict call
+    BATCH_MAX_WAIT_MS = 5.0   # how long the worker waits to fill a batch
+
+    # --- ADMISSION CONTROL ---
+    MAX_CONCURRENT_CLIENTS = 8     # clients served at once before /detect returns 503
+    ADMISSION_WAIT_TIMEOUT = 5.0   # seconds a pending frame waits for its client's slot
+    RETRY_AFTER_SECONDS = 0.5      # retry hint sent with 503 responses
+
+    # --- SESSIONS ---
+    SESSION_TTL = 300.0            # seconds before an idle client's state is dropped
+    MAX_SESSIONS = 1000            # upper bound on clients tracked at once
+
+    # --- OBJECT TRACKING ---
+    TRACK_IOU_THRESHOLD = 0.3      # min overlap to continue a track
+    TRACK_MAX_AGE = 1.5            # seconds a track survives without a match
+    TRACK_INFERENCE_INTERVAL = 1   # run YOLO every Nth frame, extrapolate tracks in between
+
+    # --- STATIC-SCENE CACHE / MOTION GATE ---
+    SCENE_CACHE_ENABLED = True     # reuse the last detections while the scene doesn't change
+    SCENE_CACHE_THRESHOLD = 3.0    # max mean gray-level difference (0-255) of 32x24 thumbnails
+    MOTION_GATE_ENABLED = True     # extrapolate tracks instead of running YOLO on small changes
+    MOTION_GATE_THRESHOLD = 10.0   # max thumbnail difference for extrapolating
+    MOTION_HINT_THRESHOLD = 0.5    # phone rotation rate (rad/s) above which YOLO always runs
+    MAX_STALE_FRAMES = 4           # run YOLO at least every (N+1)th frame of a session
+    MAX_STALE_MS = 500             # ...and at least this often: the alert latency budget
+
+    # --- WEBSOCKET STREAMING ---
+    STREAM_MAX_FRAME_AGE_MS = 1000  # frames waiting longer than this are dropped, not inferred
+
+    # --- STARTUP ---
+    WARMUP_RUNS = 2                # dummy frames run through the batcher before readiness
+
+    # --- VOICE TRANSCRIPTION ---
+    TRANSCRIPTION_BACKEND = 'groq'       # 'groq' (hosted API) or 'local' (faster-whisper on CPU, offline)
+    LOCAL_WHISPER_MODEL = 'base.en'      # faster-whisper model size, or a folder with a converted model
+    LOCAL_WHISPER_COMPUTE_TYPE = 'int8'  # CTranslate2 compute type on CPU
+    LOCAL_WHISPER_THREADS = 0            # 0 = CTranslate2 default
+    VAD_ENABLED = True                   # decode + trim silence, skip recordings with no speech
+    VAD_MIN_LEVEL_DB = -45.0             # frames quieter than this (dBFS) are never speech
+    VAD_MIN_SPEECH_MS = 200              # less speech than this = "No clear speech detected"
+    TRANSCRIBE_WORKERS = 2               # transcriptions running at once
+    TRANSCRIBE_MAX_PENDING = 8           # queued transcriptions before /transcribe returns 503
+    TRANSCRIBE_TIMEOUT = 15.0            # seconds a request waits for its transcription
+    SPEECH_API_TIMEOUT = 10.0            # per-call HTTP timeout to the hosted speech API
+    SPEECH_API_CONNECTIONS = 4           # pooled keep-alive connections to the hosted speech API
+    TRANSCRIPT_CACHE_SIZE = 256          # recent recordings whose transcripts are reused (0 = off)
+
+    # --- MULTI-PROCESS SERVING (serve.py) ---
+    WORKERS = 0                    # worker processes, 0 = one per CPU core
+    THREADS_PER_WORKER = 0         # torch/OpenCV threads per worker, 0 = cores / workers
+    WORKER_RESTART_DELAY = 1.0     # seconds before a crashed worker is restarted
 
 
 config = Config()
 
 # ==================== GLOBAL STATE ====================
-last_announcement_time = defaultdict(float)
-frame_count = 0
+sessions = SessionStore(
+    ttl=config.SESSION_TTL,
+    max_sessions=config.MAX_SESSIONS,
+    tracker_factory=lambda: Tracker(
+        iou_threshold=config.TRACK_IOU_THRESHOLD,
+        max_age=config.TRACK_MAX_AGE
+    ),
+    currency_factory=lambda: CurrencyTally(
+        coverage=config.CURRENCY_STREAM_COVERAGE,
+        max_skip=config.CURRENCY_STREAM_MAX_SKIP,
+        match_iou=config.CURRENCY_STREAM_MATCH_IOU,
+        max_notes=config.CURRENCY_STREAM_MAX_NOTES,
+        relocate_attempts=config.CURRENCY_STREAM_RELOCATE_ATTEMPTS
+    ),
+    scene_factory=lambda: SceneCache(
+        threshold=config.SCENE_CACHE_THRESHOLD if config.SCENE_CACHE_ENABLED else None,
+        change_threshold=config.MOTION_GATE_THRESHOLD if config.MOTION_GATE_ENABLED else None,
+        motion_threshold=config.MOTION_HINT_THRESHOLD,
+        max_stale_frames=config.MAX_STALE_FRAMES,
+        max_stale_age=config.MAX_STALE_MS / 1000
+    )
+)
+frame_count = 0  # total frames across all sessions
+cascade_counts = {"infer": 0, "reuse": 0, "extrapolate": 0}  # how frames were answered
+result_staleness = deque(maxlen=1000)  # ms since the YOLO run behind each recent answer
+frame_count_lock = threading.Lock()
 model = None
-device = 'cuda' if torch.cuda.is_available() else 'cpu'
+inference_backend = None  # backend actually serving, see Config.INFERENCE_BACKEND
+class_lookup = None  # per-class-id arrays, see build_class_lookup
+int8_report = None  # FP32 vs INT8 comparison from the last INT8 load, see load_int8_model
+batcher = None
+admission = AdmissionController(
+    max_inflight=config.MAX_CONCURRENT_CLIENTS,
+    wait_timeout=config.ADMISSION_WAIT_TIMEOUT,
+    retry_after=config.RETRY_AFTER_SECONDS
+)
+resolution = ResolutionController(
+    ladder=config.RESOLUTION_LADDER,
+    start_size=config.IMAGE_SIZE,
+    max_size=config.RESOLUTION_MAX_SIZE or config.IMAGE_SIZE,
+    target_ms=config.TARGET_LATENCY_MS,
+    step_interval=config.RESOLUTION_STEP_INTERVAL,
+    frame_interval_ms=config.FRAME_INTERVAL_MS,
+    max_frame_interval_ms=config.MAX_FRAME_INTERVAL_MS,
+    max_queue_depth=config.BATCH_MAX_SIZE
+)
+transcriptions = TranscriptionQueue(
+    workers=config.TRANSCRIBE_WORKERS,
+    max_pending=config.TRANSCRIBE_MAX_PENDING,
+    timeout=config.TRANSCRIBE_TIMEOUT,
+    retry_after=config.RETRY_AFTER_SECONDS
+)
+transcript_cache = TranscriptCache(max_size=config.TRANSCRIPT_CACHE_SIZE)
+models = ModelRegistry(budget_mb=config.MODEL_MEMORY_BUDGET_MB)  # every mode's model, by name
+shared_weights = {}  # weights -> (model, backend) loaded before forking, see share_weights
+streams = {}  # socket.io sid -> FrameStream
+streams_lock = threading.Lock()
+device = None  # 'cuda' or 'cpu', set by select_device when the model loads
+
+# Startup: liveness is immediate, readiness waits for the model and warm-up
+ready = threading.Event()
+startup_phase = "starting"
+startup_timings = {"imports": round((time.time() - IMPORT_START) * 1000, 1)}  # phase -> ms
+
+# Post-processing works on indices into these; distances go from far to
+# close, so "moved closer" is a comparison of indices
+POSITIONS = np.array(["to the left", "in front", "to the right"], dtype=object)
+DISTANCES = np.array(["far away", "at medium distance", "close"], dtype=object)
+
+# cv2.imdecode flags for libjpeg scaled decoding (1/1, 1/2, 1/4, 1/8)
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
 
 # ==================== MODEL INITIALIZATION ====================
-def initialize_model():
-    """Initialize YOLO model with GPU support if available."""
-    global model
+def finish_phase(phase: str, started: float, next_phase: str) -> float:
+    """Record how long a startup phase took and move on. Returns the next phase's start."""
+    global startup_phase
+    now = time.time()
+    startup_timings[phase] = round((now - started) * 1000, 1)
+    startup_phase = next_phase
+    return now
+
+
+def select_device() -> str:
+    """Pick the inference device. Imports torch, so it only runs at model load."""
+    global device
+    import torch
+
+    if torch.cuda.is_available():
+        device = 'cuda'
+        logger.info(f"✅ GPU detected: {torch.cuda.get_device_name(0)}")
+    else:
+        device = 'cpu'
+        logger.info("ℹ️  Running on CPU")
+    return device
+
+
+def load_detector() -> bool:
+    """Load the YOLO model with GPU support if available."""
+    global model, inference_backend, class_lookup, startup_phase
     
     logger.info(f"🔄 Loading YOLO model: {config.MODEL_FILE}...")
+    started = time.time()
+    startup_phase = "model_load"
     
     try:
-        model = YOLO(config.MODEL_FILE)
-        
-        # Use GPU if available
-        if torch.cuda.is_available():
-            device = 'cuda'
-            logger.info(f"✅ GPU detected: {torch.cuda.get_device_name(0)}")
-        else:
-            device = 'cpu'
-            logger.info("ℹ️  Running on CPU")
-        
-        model.to(device)
-        logger.info(f"✅ Model loaded successfully on {device}!")
-        
+        model, inference_backend = load_model(
+            config.MODEL_FILE, config.INFERENCE_BACKEND, config.IMAGE_SIZE, select_device()
+        )
+        class_lookup = build_class_lookup(model.names)
+        if config.USE_INT8:
+            model, inference_backend = load_int8_model(model, inference_backend)
+        finish_phase("model_load", started, "warmup")
+        logger.info(f"✅ Model loaded successfully on {device} ({inference_backend} backend)!")
         return True
         
     except Exception as e:
+        startup_phase = "failed"
         logger.error(f"❌ Error loading model: {e}")
         return False
 
+
+def describe_detections(result, frame_shape: tuple) -> list:
+    """(class, position, distance) of each confident detection, as the user would hear it."""
+    boxes = result.boxes.xyxy.cpu().numpy()
+    confidences = result.boxes.conf.cpu().numpy()
+    class_ids = result.boxes.cls.cpu().numpy().astype(np.int64)
+
+    keep = confidences >= config.CONFIDENCE_THRESHOLD
+    boxes, class_ids = boxes[keep], class_ids[keep]
+    if config.INFER_ON_UNROTATED:
+        boxes = rotate_boxes_clockwise(boxes, frame_shape[0])
+
+    img_width, img_height = portrait_size(frame_shape)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    positions = calculate_positions(boxes[:, 0], boxes[:, 2], img_width)
+    distances = calculate_distances(class_ids, areas, img_width * img_height)
+    return [
+        (class_lookup["names"][c], POSITIONS[p], DISTANCES[d])
+        for c, p, d in zip(class_ids, positions, distances)
+    ]
+
+
+def load_int8_model(fp32_model, backend: str) -> tuple:
+    """
+    Quantize the ONNX model to INT8 and return it only if its detections match
+    the FP32 model's on held-out sample frames (prepared like served frames);
+    otherwise keep FP32. Returns (model, backend).
+    """
+    global int8_report
+    from ultralytics import YOLO
+
+    if backend != 'onnx':
+        logger.warning(f"⚠️  USE_INT8 needs the onnx backend (running {backend}), skipping INT8")
+        return fp32_model, backend
+
+    try:
+        # Same frames YOLO sees when serving: decoded, downscaled and rotated like process_image
+        frames = []
+        for path in sorted(Path(__file__).parent.glob(config.INT8_CALIBRATION_IMAGES)):
+            frame = decode_image(path.read_bytes(), config.MAX_IMAGE_EDGE)
+            if not config.INFER_ON_UNROTATED:
+                frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
+            frames.append(frame)
+
+        # Check accuracy on frames the quantizer never calibrated on
+        every = max(2, config.INT8_HOLDOUT_EVERY)
+        check_frames = frames[every - 1::every]
+        calibration_frames = [f for i, f in enumerate(frames) if i % every != every - 1]
+        if not check_frames or not calibration_frames:
+            raise RuntimeError(f"Need at least {every} sample frames for calibration and the accuracy check")
+
+        int8_path = quantize_model(exported_model_path(config.MODEL_FILE, 'onnx'), calibration_frames, config.IMAGE_SIZE)
+        int8_model = YOLO(str(int8_path), task="detect")
+
+        predict_kwargs = {"imgsz": config.IMAGE_SIZE, "conf": config.CONFIDENCE_THRESHOLD, "verbose": False}
+        reference = [describe_detections(fp32_model.predict(f, **predict_kwargs)[0], f.shape) for f in check_frames]
+        candidate = [describe_detections(int8_model.predict(f, **predict_kwargs)[0], f.shape) for f in check_frames]
+        report = compare_detections(reference, candidate, config.PRIORITY_OBJECTS)
+    except Exception as e:
+        logger.error(f"❌ INT8 quantization failed, keeping FP32: {e}")
+        int8_report = {"accepted": False, "error": str(e)}
+        return fp32_model, backend
+
+    # Safety alerts must not regress silently: no reference detections means nothing was checked
+    report["accepted"] = (
+        report["match_rate"] is not None and report["match_rate"] >= config.INT8_MIN_MATCH_RATE
+        and report["priority_recall"] is not None and report["priority_recall"] >= config.INT8_MIN_PRIORITY_RECALL
+    )
+    int8_report = report
+    if not report["accepted"]:
+        logger.warning(f"⚠️  INT8 model rejected, keeping FP32: {report}")
+        return fp32_model, backend
+
+    logger.info(f"✅ INT8 model accepted: {report}")
+    return int8_model, 'onnx-int8'
+
+
+def start_batcher():
+    """Start the inference worker thread. Must run in the process that serves requests."""
+    global batcher
+
+    # All predict calls go through one worker thread that batches frames
+    predict_kwargs = {
+        "save": False,
+        "verbose": False,
+        "conf": config.CONFIDENCE_THRESHOLD,
+        "imgsz": config.IMAGE_SIZE
+    }
+    if config.USE_HALF and device == 'cuda':
+        predict_kwargs["half"] = True  # fp16 only helps on GPU
+
+    batcher = InferenceBatcher(
+        model,
+        max_batch_size=config.BATCH_MAX_SIZE,
+        max_wait_ms=config.BATCH_MAX_WAIT_MS,
+        predict_kwargs=predict_kwargs
+    )
+    batcher.start()
+
+    # /detect depends on the obstacle model, so the registry never unloads it
+    models.add('obstacle', ServedModel(
+        model, batcher, inference_backend,
+        model_size_mb(model, inference_backend, model_artifact(config.MODEL_FILE, inference_backend)),
+        lookup=class_lookup
+    ), pinned=True)
+
+
+def model_artifact(weights: str, backend: str) -> Path:
+    """File (or folder) a backend actually loads for these weights."""
+    if backend == 'onnx-int8':
+        return quantized_model_path(exported_model_path(weights, 'onnx'))
+    return exported_model_path(weights, backend)
+
+
+def load_served_model(weights: str, imgsz: int, conf: float, lookup=None) -> ServedModel:
+    """
+    Load weights on the configured backend with their own warmed-up batcher,
+    for the model registry. lookup(names) builds per-class data once at load.
+    """
+    if not Path(weights).exists():
+        raise FileNotFoundError(f"Model not found: {weights}")
+
+    # serve.py may have loaded these weights before forking the workers
+    served_model, backend = (
+        shared_weights.pop(weights, None)
+        or load_model(weights, config.INFERENCE_BACKEND, imgsz, select_device())
+    )
+    served_batcher = InferenceBatcher(
+        served_model,
+        max_batch_size=config.BATCH_MAX_SIZE,
+        max_wait_ms=config.BATCH_MAX_WAIT_MS,
+        predict_kwargs={"save": False, "verbose": False, "conf": conf, "imgsz": imgsz}
+    )
+    served_batcher.start()
+    served_batcher.submit(np.zeros((imgsz, imgsz, 3), dtype=np.uint8))
+    return ServedModel(
+        served_model, served_batcher, backend,
+        model_size_mb(served_model, backend, model_artifact(weights, backend)),
+        lookup=lookup(served_model.names) if lookup else None
+    )
+
+
+def share_weights(weights: str, imgsz: int):
+    """
+    Load weights for load_served_model ahead of time, without a batcher, and
+    run one frame so the fused model is built now. serve.py calls this before
+    forking so the workers share one copy.
+    """
+    served_model, backend = load_model(weights, config.INFERENCE_BACKEND, imgsz, select_device())
+    served_model.predict(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), imgsz=imgsz, verbose=False)
+    shared_weights[weights] = (served_model, backend)
+
+
+def preload_models():
+    """Load Config.PRELOAD_MODELS now, so their first request does not pay for it."""
+    for name in config.PRELOAD_MODELS:
+        started = time.time()
+        try:
+            models.get(name)
+            startup_timings[f"{name}_load"] = round((time.time() - started) * 1000, 1)
+        except Exception as e:
+            logger.warning(f"⚠️  Could not preload model '{name}': {e}")
+
+
+def warm_up() -> bool:
+    """
+    Run dummy frames through the batcher so the first real /detect does not
+    pay for lazy initialization (predictor setup, layer fusion, kernels),
+    then mark the server ready.
+    """
+    global startup_phase
+    started = time.time()
+    startup_phase = "warmup"
+    try:
+        # Every input size the resolution ladder can pick
+        sizes = [size for size, _ in resolution.ladder] if config.ADAPTIVE_RESOLUTION else [config.IMAGE_SIZE]
+        for size in sizes:
+            frame = np.zeros((size, size, 3), dtype=np.uint8)
+            for _ in range(config.WARMUP_RUNS):
+                batcher.submit(frame, imgsz=size)
+    except Exception as e:
+        startup_phase = "failed"
+        logger.error(f"❌ Warm-up inference failed: {e}")
+        return False
+
+    finish_phase("warmup", started, "ready")
+    ready.set()
+    return True
+
+
+def initialize_model() -> bool:
+    """Load the model, start batched inference and warm it up (single-process server)."""
+    if not load_detector():
+        return False
+    start_batcher()
+    return warm_up()
+
 # ==================== HELPER FUNCTIONS ====================
-def should_announce(class_name: str) -> bool:
-    """Check if enough time has passed to announce this object again."""
-    current_time = time.time()
-    if current_time - last_announcement_time[class_name] >= config.COOLDOWN_TIME:
-        last_announcement_time[class_name] = current_time
-        return True
-    return False
+def build_class_lookup(names: dict) -> dict:
+    """
+    Per-class-id arrays so post-processing can index instead of doing a dict
+    lookup per box: class names, "close" area thresholds and priority flags.
+    """
+    count = max(names) + 1 if names else 0
+    class_names = np.array([names.get(i, str(i)) for i in range(count)], dtype=object)
+    thresholds = np.array(
+        [config.CLASS_THRESHOLDS.get(name, config.DEFAULT_THRESHOLD) for name in class_names],
+        dtype=np.float64
+    )
+    priority = np.array([name in config.PRIORITY_OBJECTS for name in class_names], dtype=bool)
+    return {"names": class_names, "thresholds": thresholds, "priority": priority}
 
-def calculate_position(x1: float, x2: float, frame_width: int) -> str:
-    """Determine object position relative to frame center."""
+def calculate_positions(x1: np.ndarray, x2: np.ndarray, frame_width: int) -> np.ndarray:
+    """Position index (into POSITIONS) of each box relative to frame center."""
     object_center_x = (x1 + x2) / 2
     frame_center_x = frame_width / 2
     center_threshold = frame_width * config.CENTER_THRESHOLD
 
-    if object_center_x < frame_center_x - center_threshold:
-        return "to the left"
-    elif object_center_x > frame_center_x + center_threshold:
-        return "to the right"
-    else:
-        return "in front"
+    return np.where(
+        object_center_x < frame_center_x - center_threshold, 0,
+        np.where(object_center_x > frame_center_x + center_threshold, 2, 1)
+    )
 
-def calculate_distance(class_name: str, box_area: float, frame_area: float) -> str:
+def calculate_distances(class_ids: np.ndarray, box_areas: np.ndarray, frame_area: float) -> np.ndarray:
     """
-    Estimate distance based on object TYPE and size.
+    Distance index (into DISTANCES) from object TYPE and size.
     Uses specific thresholds for Cars vs Cups vs People.
     """
-    area_ratio = box_area / frame_area
+    area_ratio = box_areas / frame_area
 
-    # 1. Get the "Close Limit" for this specific class
-    # If not found, default to 0.15
-    close_limit = config.CLASS_THRESHOLDS.get(class_name, config.DEFAULT_THRESHOLD)
+    # 1. The "Close Limit" for each box's class (DEFAULT_THRESHOLD if not listed)
+    close_limit = class_lookup["thresholds"][class_ids]
 
     # 2. Define "Medium" as 33% of the Close limit
-    medium_limit = close_limit * 0.33 
+    medium_limit = close_limit * 0.33
 
-    if area_ratio > close_limit:
-        return "close"
-    elif area_ratio > medium_limit:
-        return "at medium distance"
-    else:
-        return "far away"
+    return (area_ratio > medium_limit).astype(np.int64) + (area_ratio > close_limit)
 
-def process_image(image_file) -> Image.Image:
-    """Process uploaded image with rotation and downscaling."""
+def jpeg_reduction_factor(width: int, height: int, max_edge: int) -> int:
+    """Largest libjpeg scale-down (1, 2, 4 or 8) that keeps the long edge >= max_edge."""
+    longest = max(width, height)
+    for factor in (8, 4, 2):
+        if longest // factor >= max_edge:
+            return factor
+    return 1
+
+def decode_image(data: bytes, max_edge: int = 0) -> np.ndarray:
+    """
+    Decode an uploaded frame straight into a BGR NumPy array (the layout YOLO
+    expects). When max_edge is set, libjpeg scales the image down while
+    decoding, so the full-resolution frame is never materialized.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+
+    factor = 1
+    if max_edge:
+        # PIL only parses the header here, it does not decode pixels
+        width, height = Image.open(io.BytesIO(data)).size
+        factor = jpeg_reduction_factor(width, height, max_edge)
+
+    # Ignore EXIF orientation so the frame matches what PIL used to decode
+    frame = cv2.imdecode(buffer, REDUCED_DECODE_FLAGS[factor] | cv2.IMREAD_IGNORE_ORIENTATION)
+    if frame is None:
+        raise ValueError("Could not decode image")
+
+    # libjpeg only scales by powers of two, finish the last step with a resize
+    height, width = frame.shape[:2]
+    longest = max(width, height)
+    if max_edge and longest > max_edge:
+        scale = max_edge / longest
+        new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        frame = cv2.resize(frame, new_size, interpolation=cv2.INTER_AREA)
+
+    return frame
+
+def rotate_boxes_clockwise(boxes: np.ndarray, frame_height: int) -> np.ndarray:
+    """
+    Map xyxy boxes from an unrotated frame into the frame rotated 90 degrees
+    clockwise: (x, y) -> (H - y, x).
+    """
+    rotated = np.empty_like(boxes)
+    rotated[:, 0] = frame_height - boxes[:, 3]
+    rotated[:, 1] = boxes[:, 0]
+    rotated[:, 2] = frame_height - boxes[:, 1]
+    rotated[:, 3] = boxes[:, 2]
+    return rotated
+
+def portrait_size(frame_shape: tuple) -> tuple:
+    """(width, height) of the portrait frame that results are reported in."""
+    height, width = frame_shape[:2]
+    return (height, width) if config.INFER_ON_UNROTATED else (width, height)
+
+def process_image(image_file) -> np.ndarray:
+    """Decode uploaded image (downscaled during decode) into a BGR array."""
     try:
-        img = Image.open(io.BytesIO(image_file.read())).convert('RGB')
+        max_edge = 0 if config.SKIP_RESIZE else config.MAX_IMAGE_EDGE
+        frame = decode_image(image_file.read(), max_edge)
 
-        # Rotate 90 degrees clockwise for portrait mode
-        img = img.rotate(-90, expand=True)
+        # Portrait mode: either rotate the (already small) frame now, or leave
+        # it as is and rotate the boxes after inference in run_detection
+        if not config.INFER_ON_UNROTATED:
+            frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
         
-        logger.info(f"📐 Image processed: {img.size}")
-        return img
+        logger.info(f"📐 Image processed: {frame.shape[1]}x{frame.shape[0]}")
+        return frame
 
     except Exception as e:
         logger.error(f"Error processing image: {e}")
         raise
 
-def run_detection(img: Image.Image) -> dict:
-    """Run YOLO detection on image and return structured results."""
-    global frame_count
-    frame_count += 1
-
-    img_width, img_height = img.size
+def build_detections(class_ids: np.ndarray, confidences: np.ndarray, boxes: np.ndarray,
+                     img_width: int, img_height: int) -> tuple:
+    """
+    Build the detections list from arrays in one pass. Boxes are xyxy in the
+    portrait frame. Returns (detections, integer boxes, distance indices).
+    """
     frame_area = img_width * img_height
-    
-    # --- START TIMER ---
-    start_time = time.time()
-    
-    # Run YOLO inference
-    results = model.predict(
-        source=img, 
-        save=False, 
-        verbose=False, 
-        conf=config.CONFIDENCE_THRESHOLD
-    )
-    
-    # --- END TIMER (Fixes NameError) ---
-    inference_time = (time.time() - start_time) * 1000
+    class_ids = class_ids.astype(np.int64)
+    int_boxes = boxes.astype(np.int64).reshape(-1, 4)  # truncates like int()
+    x1, y1, x2, y2 = int_boxes.T
+
+    positions = calculate_positions(x1, x2, img_width)
+    distances = calculate_distances(class_ids, (x2 - x1) * (y2 - y1), frame_area)
+
+    detections = [
+        {
+            "class": name,
+            "confidence": conf,
+            "position": position,
+            "distance": distance,
+            "isPriority": is_priority,
+            "bbox": {"x1": bx1, "y1": by1, "x2": bx2, "y2": by2}
+        }
+        for name, conf, position, distance, is_priority, (bx1, by1, bx2, by2) in zip(
+            class_lookup["names"][class_ids].tolist(),
+            confidences.tolist(),
+            POSITIONS[positions].tolist(),
+            DISTANCES[distances].tolist(),
+            class_lookup["priority"][class_ids].tolist(),
+            int_boxes.tolist()
+        )
+    ]
+    return detections, int_boxes, distances
+
+def annotate_tracks(detections: list, tracks: list):
+    """Add trackId / approachRate from the matching tracks."""
+    for detection, track in zip(detections, tracks):
+        detection["trackId"] = track.track_id
+        detection["approachRate"] = round(track.approach_rate, 3)
+
+def extrapolate_detections(session: Session, img_width: int, img_height: int, now: float) -> tuple:
+    """Detections predicted from the session's tracks, for frames where YOLO is skipped."""
+    tracks = session.tracker.active_tracks(now)
+    class_ids = np.array([t.class_id for t in tracks], dtype=np.int64)
+    confidences = np.array([t.confidence for t in tracks], dtype=np.float32)
+    boxes = np.array([t.predict_box(now, img_width, img_height) for t in tracks]).reshape(-1, 4)
 
-    result = results[0]
+    detections, _, distances = build_detections(class_ids, confidences, boxes, img_width, img_height)
+    annotate_tracks(detections, tracks)
+    return detections, tracks, distances
 
-    detections = []
+def track_alerts(detections: list, tracks: list, distances: np.ndarray, now: float) -> list:
+    """
+    Alerts for priority objects. Cooldowns are per track, and an object that
+    moves into a closer distance bucket is announced right away.
+    """
     alerts = []
-    detected_items = []
+    for detection, track, distance_rank in zip(detections, tracks, distances.tolist()):
+        if not detection["isPriority"]:
+            continue
+        if track.should_announce(distance_rank, config.COOLDOWN_TIME, now):
+            alerts.append(f"Warning! {detection['class']} {detection['distance']} {detection['position']}")
+    return alerts
 
-    # Process detections
+def filter_result(result, frame_shape: tuple) -> tuple:
+    """
+    Confident top-K boxes of one YOLO result, in the portrait frame.
+    Returns (class_ids, confidences, boxes).
+    """
     if result.boxes is not None and len(result.boxes) > 0:
         boxes = result.boxes.xyxy.cpu().numpy()
         confidences = result.boxes.conf.cpu().numpy()
         class_ids = result.boxes.cls.cpu().numpy()
+    else:
+        boxes = np.empty((0, 4), dtype=np.float32)
+        confidences = np.empty(0, dtype=np.float32)
+        class_ids = np.empty(0, dtype=np.float32)
 
-        # Filter by confidence once
-        keep = confidences >= config.CONFIDENCE_THRESHOLD
-        boxes = boxes[keep]
-        confidences = confidences[keep]
-        class_ids = class_ids[keep]
-
-        # Limit to top detections by confidence
-        if len(boxes) > config.MAX_DETECTIONS:
-            top_indices = np.argsort(confidences)[-config.MAX_DETECTIONS:]
-            boxes = boxes[top_indices]
-            confidences = confidences[top_indices]
-            class_ids = class_ids[top_indices]
-        
-        for box, conf, class_id in zip(boxes, confidences, class_ids):
-            x1, y1, x2, y2 = map(int, box)
-            class_name = model.names[int(class_id)]
-            detected_items.append(class_name)
-
-            is_priority = class_name in config.PRIORITY_OBJECTS
-
-            # Calculate position
-            position_str = calculate_position(x1, x2, img_width)
-
-            # Calculate distance (Passed class_name for smart logic)
-            box_area = (x2 - x1) * (y2 - y1)
-            distance_str = calculate_distance(class_name, box_area, frame_area)
-
-            # Generate alert for priority objects
-            if is_priority and should_announce(class_name):
-                alert_msg = f"Warning! {class_name} {distance_str} {position_str}"
-                alerts.append(alert_msg)
-
-            # Add to detections
-            detections.append({
-                "class": class_name,
-                "confidence": float(conf),
-                "position": position_str,
-                "distance": distance_str,
-                "isPriority": is_priority,
-                "bbox": {"x1": x1, "y1": y1, "x2": x2, "y2": y2}
-            })
+    if config.INFER_ON_UNROTATED:
+        boxes = rotate_boxes_clockwise(boxes, frame_shape[0])
+
+    # Filter by confidence once
+    keep = confidences >= config.CONFIDENCE_THRESHOLD
+    boxes = boxes[keep]
+    confidences = confidences[keep]
+    class_ids = class_ids[keep]
+
+    # Limit to top detections by confidence (ascending, like a full argsort)
+    if len(boxes) > config.MAX_DETECTIONS:
+        top_indices = np.sort(np.argpartition(confidences, -config.MAX_DETECTIONS)[-config.MAX_DETECTIONS:])
+        top_indices = top_indices[np.argsort(confidences[top_indices], kind='stable')]
+        boxes = boxes[top_indices]
+        confidences = confidences[top_indices]
+        class_ids = class_ids[top_indices]
+
+    return class_ids, confidences, boxes
+
+def track_detections(class_ids: np.ndarray, confidences: np.ndarray, boxes: np.ndarray,
+                     img_width: int, img_height: int, session: Session, now: float) -> tuple:
+    """
+    Build detections and match them to the session's tracks.
+    Returns (detections, tracks, distance indices).
+    """
+    detections, int_boxes, distances = build_detections(
+        class_ids, confidences, boxes, img_width, img_height
+    )
+    tracks = session.tracker.update(
+        class_ids.astype(np.int64).tolist(), int_boxes.astype(float), confidences.tolist(), now
+    )
+    annotate_tracks(detections, tracks)
+    return detections, tracks, distances
+
+def postprocess_result(result, frame_shape: tuple, session: Session, now: float) -> tuple:
+    """
+    Turn one YOLO result into detections in the portrait frame and match them
+    to the session's tracks. Returns (detections, tracks, distance indices).
+    """
+    img_width, img_height = portrait_size(frame_shape)
+    class_ids, confidences, boxes = filter_result(result, frame_shape)
+    return track_detections(class_ids, confidences, boxes, img_width, img_height, session, now)
+
+def run_detection(frame: np.ndarray, session: Session, motion: float = None) -> dict:
+    """
+    Run YOLO detection on a BGR frame and return structured results.
+    motion is the phone's rotation rate (rad/s) when the client sends it.
+    """
+    global frame_count
+    with frame_count_lock:
+        frame_count += 1
+    session_frame = session.next_frame()
+    now = time.time()
+
+    # Results are reported in the portrait (rotated) frame
+    img_width, img_height = portrait_size(frame.shape)
+
+    input_size = resolution.input_size(frame.shape) if config.ADAPTIVE_RESOLUTION else config.IMAGE_SIZE
+
+    # Between full YOLO runs, extrapolate the tracked boxes instead
+    interval = config.TRACK_INFERENCE_INTERVAL
+    if interval > 1 and session_frame % interval != 0 and session.tracker.active_tracks(now):
+        stage, cached, staleness = 'extrapolate', None, None
+    else:
+        # Cheap change check on a thumbnail decides whether YOLO is needed
+        thumbnail = scene_thumbnail(frame)
+        stage, cached, staleness = session.scene.gate(thumbnail, now, motion)
+
+    if stage == 'extrapolate':
+        detections, tracks, distances = extrapolate_detections(session, img_width, img_height, now)
+        inference_time, batch_size = 0.0, 0
+    else:
+        if stage == 'reuse':
+            # Scene unchanged since the last YOLO run: reuse its detections
+            class_ids, confidences, boxes = cached
+            inference_time, batch_size = 0.0, 0
+        else:
+            # Run YOLO inference (batched with frames from other request threads),
+            # at the input size the current load allows
+            submitted = time.time()
+            result, inference_time, batch_size = batcher.submit(frame, imgsz=input_size)
+            if config.ADAPTIVE_RESOLUTION:
+                resolution.observe((time.time() - submitted) * 1000, batcher.queue_depth)
+            class_ids, confidences, boxes = filter_result(result, frame.shape)
+            session.scene.store(thumbnail, (class_ids, confidences, boxes), now)
+            session.input_size = input_size
+
+        # Reused detections still go through the tracker and alert cooldowns
+        detections, tracks, distances = track_detections(
+            class_ids, confidences, boxes, img_width, img_height, session, now
+        )
+
+    with frame_count_lock:
+        cascade_counts[stage] += 1
+        if staleness is not None:
+            result_staleness.append(staleness * 1000)
+
+    # Generate alerts for priority objects
+    alerts = track_alerts(detections, tracks, distances, now)
+    detected_items = [d["class"] for d in detections]
 
     # Prepare response
     alert_message = alerts[0] if alerts else ""
     
-    logger.info(f"✅ Frame {frame_count}: {len(detections)} objects detected")
+    logger.info(f"✅ Frame {session_frame} ({session.client_id}): {len(detections)} objects detected")
+
+    # Tell the phone how fast and how sharp to send frames at the current load
+    hints = resolution.hints()
     
     return {
         "alert": alert_message,
@@ -255,43 +823,106 @@ def run_detection(img: Image.Image) -> dict:
         "detections": detections,
         "frameWidth": img_width,
         "frameHeight": img_height,
-        "frameCount": frame_count,
+        "inputSize": session.input_size,  # of the YOLO run behind these detections
+        "frameCount": session_frame,
         "inferenceTime": round(inference_time, 2), 
+        "batchSize": batch_size,
+        "extrapolated": stage == 'extrapolate',
+        "reused": stage == 'reuse',
+        "frameIntervalMs": hints["frameIntervalMs"],
+        "jpegQuality": hints["jpegQuality"],
         "timestamp": datetime.now().isoformat()
     }
 
+def get_client_id() -> str:
+    """Identify the calling phone: X-Client-Id header, clientId form field, or its IP."""
+    return (
+        request.headers.get('X-Client-Id')
+        or request.form.get('clientId')
+        or request.remote_addr
+        or 'unknown'
+    )
+
+def empty_result(**extra) -> dict:
+    """Detection response with nothing in it (skipped frames, errors)."""
+    result = {
+        "alert": "",
+        "alerts": [],
+        "objects": [],
+        "detections": [],
+        "frameWidth": 640,
+        "frameHeight": 480,
+        "frameCount": frame_count,
+        "timestamp": datetime.now().isoformat()
+    }
+    result.update(extra)
+    return result
+
 # ==================== API ENDPOINTS ====================
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
     return jsonify({
-        "status": "healthy",
+        "status": "healthy" if ready.is_set() else "starting",
+        "ready": ready.is_set(),
         "model_loaded": model is not None,
-        "device": "cuda" if torch.cuda.is_available() else "cpu",
-        "frames_processed": frame_count
+        "inference_backend": inference_backend,
+        "device": device,
+        "frames_processed": frame_count,
+        "pid": os.getpid()  # which worker answered, when run under serve.py
     })
 
+@app.route('/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness: the process is up and answering, even while the model loads."""
+    return jsonify({"status": "alive", "pid": os.getpid()})
+
+@app.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness: model loaded and warmed up, so /detect runs at full speed."""
+    return jsonify({
+        "status": "ready" if ready.is_set() else "starting",
+        "phase": startup_phase,
+        "startup_ms": startup_timings
+    }), 200 if ready.is_set() else 503
+
 @app.route('/detect', methods=['POST'])
 def detect_object():
     """Main detection endpoint."""
     start_time = time.time()
     
-    if not model:
-        logger.error("Model not loaded")
-        return jsonify({"error": "Model not loaded"}), 500
+    if not ready.is_set():
+        response = jsonify({"error": "Model is loading", "retryAfter": config.RETRY_AFTER_SECONDS})
+        response.headers['Retry-After'] = str(math.ceil(config.RETRY_AFTER_SECONDS))
+        return response, 503
 
     if 'image' not in request.files:
         logger.warning("No image in request")
         return jsonify({"error": "No image sent"}), 400
 
+    # Latest frame wins per client; refuse quickly when the server is full
+    client_id = get_client_id()
+    try:
+        admitted = admission.acquire(client_id)
+    except Overloaded as e:
+        logger.warning(f"⚠️  Server busy, rejecting frame from {client_id}")
+        response = jsonify({"error": "Server busy", "retryAfter": e.retry_after})
+        response.headers['Retry-After'] = str(math.ceil(e.retry_after))
+        return response, 503
+
+    if not admitted:
+        # A newer frame from this client replaced this one
+        return jsonify(empty_result(skipped=True))
+
     try:
         file = request.files['image']
         
         # Process image
-        img = process_image(file)
+        frame = process_image(file)
 
-        # Run detection
-        result = run_detection(img)
+        # Run detection (motion: optional gyroscope rate from the phone, rad/s)
+        motion = request.form.get('motion', type=float)
+        result = run_detection(frame, sessions.get(client_id), motion)
         
         # Add processing time
         result['processingTime'] = round((time.time() - start_time) * 1000, 2)  # ms
@@ -306,34 +937,46 @@ def detect_object():
     except Exception as e:
         logger.error(f"❌ Detection error: {e}", exc_info=True)
         # Return empty result instead of error to keep connection alive
-        return jsonify({
-            "alert": "",
-            "alerts": [],
-            "objects": [],
-            "detections": [],
-            "frameWidth": 640,
-            "frameHeight": 480,
-            "frameCount": frame_count,
-            "timestamp": datetime.now().isoformat(),
-            "error": str(e)
-        }), 200 
+        return jsonify(empty_result(error=str(e))), 200 
+
+    finally:
+        admission.release(client_id)
 
 @app.route('/reset', methods=['POST'])
 def reset_cooldowns():
-    """Reset announcement cooldowns."""
-    global last_announcement_time
-    last_announcement_time.clear()
-    logger.info("🔄 Cooldowns reset")
+    """Reset announcement cooldowns for the calling client (or everyone with ?all=true)."""
+    if request.args.get('all', '').lower() in ('1', 'true', 'yes'):
+        reset_count = sessions.reset()
+    else:
+        reset_count = sessions.reset(get_client_id())
+    logger.info(f"🔄 Cooldowns reset ({reset_count} sessions)")
     return jsonify({
         "message": "Cooldowns reset successfully",
+        "sessions_reset": reset_count,
         "timestamp": datetime.now().isoformat()
     })
 
+def cascade_stats() -> dict:
+    """How frames were answered, and how stale the answers were."""
+    with frame_count_lock:
+        counts = dict(cascade_counts)
+        staleness = np.array(result_staleness)
+    total = sum(counts.values())
+    return {
+        "inferred": counts["infer"],
+        "reused": counts["reuse"],
+        "extrapolated": counts["extrapolate"],
+        "skip_rate": round(1 - counts["infer"] / total, 4) if total else 0.0,
+        "staleness_p99_ms": round(float(np.percentile(staleness, 99)), 1) if len(staleness) else 0.0,
+        "staleness_budget_ms": config.MAX_STALE_MS
+    }
+
 @app.route('/stats', methods=['GET'])
 def get_stats():
     """Get server statistics."""
     gpu_info = {}
-    if torch.cuda.is_available():
+    if device == 'cuda':
+        import torch  # already loaded by the model on GPU
         gpu_info = {
             "gpu_name": torch.cuda.get_device_name(0),
             "gpu_memory_allocated": f"{torch.cuda.memory_allocated(0) / 1024**2:.2f} MB",
@@ -343,10 +986,22 @@ def get_stats():
     return jsonify({
         "frames_processed": frame_count,
         "model": config.MODEL_FILE,
+        "inference_backend": inference_backend,
         "device": device,
         "confidence_threshold": config.CONFIDENCE_THRESHOLD,
         "priority_objects": sorted(list(config.PRIORITY_OBJECTS)),
         "cooldown_time": config.COOLDOWN_TIME,
+        "batching": batcher.stats() if batcher else {},
+        "int8": int8_report,
+        "admission": admission.stats(),
+        "sessions": sessions.stats(),
+        "streams": len(streams),
+        "cascade": cascade_stats(),
+        "resolution": resolution.stats(),
+        "models": models.stats(),
+        "transcription": transcriptions.stats(),
+        "transcript_cache": transcript_cache.stats(),
+        "startup": {"phase": startup_phase, "timings_ms": startup_timings},
         "gpu_info": gpu_info,
         "server_uptime": datetime.now().isoformat()
     })
@@ -356,26 +1011,179 @@ def get_config():
     """Get current configuration."""
     return jsonify({
         "model_file": config.MODEL_FILE,
+        "inference_backend": config.INFERENCE_BACKEND,
         "confidence_threshold": config.CONFIDENCE_THRESHOLD,
         "cooldown_time": config.COOLDOWN_TIME,
         "distance_close": config.DISTANCE_CLOSE if hasattr(config, 'DISTANCE_CLOSE') else 'Dynamic',
         "distance_medium": config.DISTANCE_MEDIUM if hasattr(config, 'DISTANCE_MEDIUM') else 'Dynamic',
         "center_threshold": config.CENTER_THRESHOLD,
+        "image_size": config.IMAGE_SIZE,
+        "adaptive_resolution": config.ADAPTIVE_RESOLUTION,
+        "max_image_edge": config.MAX_IMAGE_EDGE,
+        "skip_resize": config.SKIP_RESIZE,
+        "use_half": config.USE_HALF,
+        "use_int8": config.USE_INT8,
         "priority_objects_count": len(config.PRIORITY_OBJECTS)
     })
 
 @app.route('/classes', methods=['GET'])
 def get_classes():
-    """Get all detectable classes."""
+    """Get all detectable classes (of the obstacle model, or ?model=<name>)."""
+    name = request.args.get('model')
+    if name and name != 'obstacle':
+        if name not in models.names():
+            return jsonify({"error": f"Unknown model '{name}'", "models": models.names()}), 404
+        try:
+            served = models.acquire(name)
+        except Exception as e:
+            logger.error(f"❌ Could not load model '{name}': {e}")
+            return jsonify({"error": f"Model '{name}' not available"}), 503
+        try:
+            names = served.names
+        finally:
+            served.release()
+        return jsonify({
+            "model": name,
+            "classes": names,
+            "total_classes": len(names)
+        })
+
     if not model:
         return jsonify({"error": "Model not loaded"}), 500
     
     return jsonify({
+        "model": "obstacle",
         "classes": model.names,
         "total_classes": len(model.names),
         "priority_classes": sorted(list(config.PRIORITY_OBJECTS))
     })
 
+# ==================== WEBSOCKET STREAMING ====================
+class FrameStream:
+    """
+    Per-connection frame slot. Only the newest frame is kept: a frame that
+    arrives while another is waiting replaces it, so when inference falls
+    behind the client gets results for its latest frame instead of a backlog.
+    """
+
+    def __init__(self, sid: str, client_id: str):
+        self.sid = sid
+        self.client_id = client_id
+        self.lock = threading.Lock()
+        self.pending = None       # (seq, data, received_at, motion)
+        self.last_seq = -1        # highest sequence number accepted
+        self.next_seq = 0         # for clients that don't number their frames
+        self.worker_active = False
+        self.processed = 0
+        self.dropped = 0
+
+    def push(self, seq, data: bytes, motion: float = None) -> bool:
+        """Store a frame. Returns True if a worker needs to be started."""
+        with self.lock:
+            if seq is None:
+                seq = self.next_seq
+            self.next_seq = max(self.next_seq, seq + 1)
+
+            # Out of order: a newer frame was already accepted
+            if seq <= self.last_seq:
+                self.dropped += 1
+                return False
+            self.last_seq = seq
+
+            if self.pending is not None:
+                self.dropped += 1
+            self.pending = (seq, data, time.time(), motion)
+
+            if self.worker_active:
+                return False
+            self.worker_active = True
+            return True
+
+    def take(self):
+        """Pop the pending frame, or stop the worker if there is none."""
+        with self.lock:
+            frame = self.pending
+            self.pending = None
+            if frame is None:
+                self.worker_active = False
+            return frame
+
+def stream_worker(stream: FrameStream):
+    """Run detection on a connection's newest frame until its slot is empty."""
+    while True:
+        frame = stream.take()
+        if frame is None:
+            return
+
+        seq, data, received_at, motion = frame
+        age = (time.time() - received_at) * 1000
+        if age > config.STREAM_MAX_FRAME_AGE_MS:
+            with stream.lock:
+                stream.dropped += 1
+            continue
+
+        try:
+            result = run_detection(process_image(io.BytesIO(data)), sessions.get(stream.client_id), motion)
+        except Exception as e:
+            logger.error(f"❌ Stream detection error: {e}")
+            socketio.emit('detection_error', {"seq": seq, "error": str(e)}, to=stream.sid)
+            continue
+
+        with stream.lock:
+            stream.processed += 1
+            dropped = stream.dropped
+        result['seq'] = seq
+        result['dropped'] = dropped
+        result['processingTime'] = round((time.time() - received_at) * 1000, 2)  # ms, incl. wait
+        socketio.emit('detection', result, to=stream.sid)
+
+@socketio.on('connect')
+def stream_connect():
+    # Clients pass ?clientId=... to share cooldowns with their HTTP session
+    client_id = request.args.get('clientId') or request.sid
+    with streams_lock:
+        streams[request.sid] = FrameStream(request.sid, client_id)
+    logger.info(f"🔌 Stream connected: {request.sid}")
+
+@socketio.on('disconnect')
+def stream_disconnect(*args):
+    with streams_lock:
+        streams.pop(request.sid, None)
+    logger.info(f"🔌 Stream disconnected: {request.sid}")
+
+@socketio.on('frame')
+def stream_frame(payload):
+    """
+    Receive one JPEG frame. Payload is either the raw bytes or
+    {"seq": int, "image": bytes, "motion": float}. Results come back as
+    'detection' events.
+    """
+    if not ready.is_set():
+        emit('detection_error', {"error": "Model is loading"})
+        return
+
+    motion = None
+    if isinstance(payload, dict):
+        seq, data = payload.get('seq'), payload.get('image')
+        if isinstance(payload.get('motion'), (int, float)):
+            motion = float(payload['motion'])
+    else:
+        seq, data = None, payload
+    if seq is not None and (not isinstance(seq, int) or isinstance(seq, bool)):
+        emit('detection_error', {"seq": None, "error": "seq must be an integer"})
+        return
+    if not isinstance(data, (bytes, bytearray)) or not data:
+        emit('detection_error', {"seq": seq, "error": "No image sent"})
+        return
+
+    with streams_lock:
+        stream = streams.get(request.sid)
+    if stream is None:
+        return
+
+    if stream.push(seq, bytes(data), motion):
+        socketio.start_background_task(stream_worker, stream)
+
 # ==================== ERROR HANDLERS ====================
 @app.errorhandler(404)
 def not_found(error):
@@ -383,6 +1191,9 @@ def not_found(error):
         "error": "Endpoint not found",
         "available_endpoints": [
             "POST /detect",
+            "POST /currency",
+            "POST /currency/stream",
+            "WS   frame (socket.io)",
             "GET /health",
             "GET /stats",
             "GET /config",
@@ -401,10 +1212,42 @@ def request_entity_too_large(error):
     return jsonify({"error": "File too large"}), 413
 
 # ==================== VOICE TRANSCRIPTION ENDPOINT ====================
+def get_speech_backend() -> TranscriptionBackend:
+    """Create the configured speech backend on first use, keeping its imports off the startup path."""
+    global speech_backend
+    with speech_backend_lock:
+        if speech_backend is None:
+            if config.TRANSCRIPTION_BACKEND == 'local':
+                speech_backend = LocalWhisperBackend(
+                    model=config.LOCAL_WHISPER_MODEL,
+                    compute_type=config.LOCAL_WHISPER_COMPUTE_TYPE,
+                    cpu_threads=config.LOCAL_WHISPER_THREADS
+                )
+            elif config.TRANSCRIPTION_BACKEND == 'groq':
+                speech_backend = GroqBackend(
+                    api_key=os.getenv('GROQ_API_KEY'),
+                    base_url=os.getenv('GROQ_BASE_URL'),  # e.g. fake_speech_api.py when testing
+                    timeout=config.SPEECH_API_TIMEOUT,
+                    max_connections=config.SPEECH_API_CONNECTIONS
+                )
+            else:
+                raise ValueError(f"Unknown transcription backend '{config.TRANSCRIPTION_BACKEND}'")
+        return speech_backend
+
+def warm_up_speech():
+    """Load and warm up the speech backend (the local model takes a few seconds)."""
+    try:
+        started = time.time()
+        get_speech_backend().warm_up()
+        startup_timings["speech_warmup"] = round((time.time() - started) * 1000, 1)
+    except Exception as e:
+        logger.error(f"❌ Speech backend warm-up failed: {e}")
+
 @app.route('/transcribe', methods=['POST'])
 def transcribe_audio():
     """
-    Transcribe audio to text using Groq's Whisper API.
+    Transcribe audio to text with the configured speech backend
+    (Groq's Whisper API or a local Whisper model).
     Expects audio file in request.
     """
     print("\n" + "="*60)
@@ -423,12 +1266,14 @@ def transcribe_audio():
             print("❌ ERROR: Empty audio file")
             return jsonify({'error': 'Empty audio file'}), 400
         
-        # Check if Groq API key is configured
-        if not groq_client.api_key:
-            print("❌ ERROR: Groq API key not configured")
-            return jsonify({'error': 'Groq API key not configured'}), 500
+        # Check the speech backend is configured (Groq needs an API key)
+        try:
+            backend = get_speech_backend()
+        except Exception as e:
+            print(f"❌ ERROR: {e}")
+            return jsonify({'error': str(e)}), 500
         
-        print("✅ Groq API key found")
+        print(f"✅ Speech backend: {backend.name}")
         
         # Read audio file
         audio_data = audio_file.read()
@@ -445,36 +1290,63 @@ def transcribe_audio():
                 'error': 'Audio file too small or silent'
             }), 400
         
-        # Create a temporary file-like object
-        audio_file_obj = io.BytesIO(audio_data)
-        audio_file_obj.name = 'audio.m4a'
-        
-        print("� Sending to Groq Whisper API...")
-        print(f"   Model: whisper-large-v3-turbo")
-        print(f"   Language: en")
-        print(f"   Temperature: 0.0")
-        
-        # Transcribe using Groq Whisper with optimized parameters
-        transcription = groq_client.audio.transcriptions.create(
-            file=(audio_file_obj.name, audio_data),  # Pass as tuple (filename, bytes)
-            model="whisper-large-v3-turbo",
-            language="en",  # Improves accuracy and latency
-            response_format="verbose_json",
-            temperature=0.0,  # Most deterministic output
-            prompt="Voice commands for navigation: Netra for vision, Mudra for currency, Marga for navigation."  # Context helps accuracy
-        )
-        
-        transcribed_text = transcription.text.strip()
+        # Decode to 16 kHz mono and cut silence before paying for a transcription
+        pcm = None
+        if config.VAD_ENABLED:
+            try:
+                pcm = decode_audio(audio_data)
+            except Exception as e:
+                print(f"⚠️  WARNING: Could not decode audio ({e}), sending the file as is")
+
+        if pcm is not None:
+            speech = trim_silence(
+                pcm,
+                min_level_db=config.VAD_MIN_LEVEL_DB,
+                min_speech_ms=config.VAD_MIN_SPEECH_MS
+            )
+            if speech is None:
+                print(f"🚫 NO SPEECH DETECTED in {len(pcm) / SAMPLE_RATE:.2f}s of audio, skipping transcription")
+                return jsonify({
+                    'success': False,
+                    'text': '',
+                    'error': 'No clear speech detected. Please speak louder and try again.'
+                })
+            print(f"🔊 Speech: {len(speech) / SAMPLE_RATE:.2f}s of {len(pcm) / SAMPLE_RATE:.2f}s (silence trimmed)")
+
+        # Identical recordings (e.g. a replayed "open netra") reuse the earlier transcript
+        cache_key = audio_key(pcm=speech) if pcm is not None else audio_key(raw=audio_data)
+        transcription = transcript_cache.get(cache_key)
+        cached = transcription is not None
+        try:
+            if cached:
+                print("⚡ Transcript cache hit")
+            else:
+                # Runs on the transcription workers, never more than a bounded backlog
+                print(f"🔄 Transcribing with {backend.name} (queue depth {transcriptions.queue_depth})...")
+                if pcm is not None:
+                    transcription = transcriptions.run(backend.transcribe_pcm, speech, audio_data, 'audio.m4a')
+                else:
+                    transcription = transcriptions.run(backend.transcribe, audio_data, 'audio.m4a')
+                transcript_cache.put(cache_key, transcription)
+        except Overloaded as e:
+            print("⚠️  WARNING: Transcription queue full, rejecting request")
+            response = jsonify({'success': False, 'error': 'Server busy', 'retryAfter': e.retry_after})
+            response.headers['Retry-After'] = str(math.ceil(e.retry_after))
+            return response, 503
+        except TimeoutError as e:
+            print(f"⚠️  WARNING: {e}")
+            return jsonify({'success': False, 'error': 'Transcription timed out'}), 504
+        transcribed_text = transcription.text
         
         print("="*60)
-        print(f"📝 RAW TRANSCRIPTION FROM GROQ:")
+        print(f"📝 RAW TRANSCRIPTION ({backend.name}):")
         print(f"   Text: '{transcribed_text}'")
         print(f"   Length: {len(transcribed_text)} characters")
-        print(f"   Language: {getattr(transcription, 'language', 'N/A')}")
-        print(f"   Duration: {getattr(transcription, 'duration', 'N/A')} seconds")
+        print(f"   Language: {transcription.language or 'N/A'}")
+        print(f"   Duration: {transcription.duration or 'N/A'} seconds")
         
         # Debug verbose_json metadata
-        if hasattr(transcription, 'segments') and transcription.segments:
+        if transcription.segments:
             print(f"   Segments: {len(transcription.segments)}")
             for i, seg in enumerate(transcription.segments[:5]):  # Show first 5 segments
                 avg_logprob = seg.get('avg_logprob', 'N/A')
@@ -493,36 +1365,19 @@ def transcribe_audio():
                     print(f"         ⚠️  LOW CONFIDENCE!")
                 if isinstance(no_speech_prob, (int, float)) and no_speech_prob > 0.5:
                     print(f"         ⚠️  MIGHT BE SILENCE/NOISE!")
-        
-        print("="*60)
-        
-        # Improved noise detection using metadata
-        is_likely_noise = False
-        
-        # Check if text matches common noise patterns
-        noise_words = ['thank you', 'thanks', 'you', 'bye', 'thank', 'you.']
-        if transcribed_text.lower().strip() in noise_words:
-            is_likely_noise = True
-            print(f"🚫 DETECTED COMMON NOISE PHRASE: '{transcribed_text}'")
-        
-        # Check metadata for quality issues
-        if hasattr(transcription, 'segments') and transcription.segments:
-            avg_no_speech = sum(seg.get('no_speech_prob', 0) for seg in transcription.segments) / len(transcription.segments)
-            avg_confidence = sum(seg.get('avg_logprob', 0) for seg in transcription.segments) / len(transcription.segments)
             
             print(f"📊 QUALITY METRICS:")
-            print(f"   Average No Speech Prob: {avg_no_speech:.4f}")
-            print(f"   Average Confidence: {avg_confidence:.4f}")
-            
-            if avg_no_speech > 0.5:
-                is_likely_noise = True
-                print(f"🚫 HIGH NO-SPEECH PROBABILITY: {avg_no_speech:.2f}")
-            
-            if avg_confidence < -1.0:
-                print(f"⚠️  LOW CONFIDENCE: {avg_confidence:.2f}")
+            print(f"   Average No Speech Prob: {transcription.avg_no_speech_prob:.4f}")
+            print(f"   Average Confidence: {transcription.avg_logprob:.4f}")
+            if transcription.avg_logprob < LOW_CONFIDENCE_LOGPROB:
+                print(f"⚠️  LOW CONFIDENCE: {transcription.avg_logprob:.2f}")
         
-        if is_likely_noise:
-            print("🚫 FILTERED AS NOISE")
+        print("="*60)
+        
+        # Same noise filtering for every backend: noise phrases and no-speech probability
+        reason = noise_reason(transcription)
+        if reason:
+            print(f"🚫 FILTERED AS NOISE: {reason}")
             return jsonify({
                 'success': False,
                 'text': '',
@@ -530,11 +1385,20 @@ def transcribe_audio():
             })
         
         print(f"✅ TRANSCRIPTION ACCEPTED: '{transcribed_text}'")
+        
+        # Resolve the command here so the app doesn't have to
+        intent = resolve_intent(transcribed_text)
+        if intent:
+            print(f"🧭 Intent: {intent['intent']} ({intent['match']} match on '{intent['keyword']}')")
+        else:
+            print("🧭 Intent: none")
         print("="*60 + "\n")
         
         response_data = {
             'success': True,
-            'text': transcribed_text
+            'text': transcribed_text,
+            'intent': intent['intent'] if intent else None,
+            'cached': cached
         }
         
         print(f"📤 SENDING RESPONSE TO CLIENT:")
@@ -557,13 +1421,129 @@ def transcribe_audio():
             'error': str(e)
         }), 500
 
+# ==================== CURRENCY ENDPOINT ====================
+models.register('currency', lambda: load_served_model(
+    config.CURRENCY_MODEL_FILE, config.CURRENCY_IMAGE_SIZE, config.CURRENCY_CONFIDENCE,
+    lookup=lambda names: {"values": note_values(names)}
+))
+
+@app.route('/currency', methods=['POST'])
+def detect_currency():
+    """
+    Count the banknotes in a photo: per-denomination counts and total rupee
+    value. tiled=true (form field or query) runs the photo as overlapping
+    tiles, for dense piles of notes.
+    """
+    start_time = time.time()
+
+    if 'image' not in request.files:
+        return jsonify({"error": "No image sent"}), 400
+
+    # Loads the banknote model on first use; held until the response is built
+    try:
+        served = models.acquire('currency')
+    except Exception as e:
+        logger.error(f"❌ Currency model not available: {e}")
+        return jsonify({"error": "Currency model not available"}), 503
+
+    tiled = request.values.get('tiled')
+    tiled = config.CURRENCY_TILED if tiled is None else tiled.lower() in ('1', 'true', 'yes')
+
+    try:
+        frame = decode_image(request.files['image'].read(), config.CURRENCY_MAX_IMAGE_EDGE)
+        if tiled:
+            boxes, confidences, class_ids, tiles, inference_time = predict_tiled(
+                served.batcher, frame, config.CURRENCY_TILE_SIZE, config.CURRENCY_TILE_OVERLAP,
+                config.CURRENCY_CONFIDENCE,
+                full_size=config.CURRENCY_IMAGE_SIZE if config.CURRENCY_TILE_FULL_PASS else None,
+                iou_threshold=config.CURRENCY_NMS_IOU
+            )
+        else:
+            result, inference_time, _ = served.batcher.submit(frame)
+            boxes, confidences, class_ids = result_arrays(result, config.CURRENCY_CONFIDENCE)
+            tiles = 1
+        report = count_notes(boxes, confidences, class_ids, served.names, served.lookup["values"])
+    except Exception as e:
+        logger.error(f"❌ Currency detection error: {e}", exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        served.release()
+
+    logger.info(f"💰 Currency: {report['counts']} = ₹{report['total']}")
+    return jsonify({
+        "success": True,
+        **report,
+        "message": describe_notes(report["denominations"], report["total"]),
+        "frameWidth": frame.shape[1],
+        "frameHeight": frame.shape[0],
+        "tiles": tiles,
+        "inferenceTime": round(inference_time, 2),
+        "processingTime": round((time.time() - start_time) * 1000, 2),  # ms
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route('/currency/stream', methods=['POST'])
+def stream_currency():
+    """
+    One frame of a panning currency scan. Notes are matched across the
+    client's frames and counted once; the response holds the running tally.
+    """
+    start_time = time.time()
+
+    if 'image' not in request.files:
+        return jsonify({"error": "No image sent"}), 400
+
+    try:
+        served = models.acquire('currency')
+    except Exception as e:
+        logger.error(f"❌ Currency model not available: {e}")
+        return jsonify({"error": "Currency model not available"}), 503
+
+    tally = sessions.get(get_client_id()).currency
+    try:
+        frame = decode_image(request.files['image'].read(), config.CURRENCY_STREAM_MAX_IMAGE_EDGE)
+        # One frame per client at a time: the pan and the note positions move together
+        with tally.lock:
+            inference_time, new_notes = 0.0, 0
+            inferred = tally.track(frame)
+            if inferred:
+                result, inference_time, _ = served.batcher.submit(frame)
+                new_notes = tally.add(*result_arrays(result, config.CURRENCY_CONFIDENCE))
+            report = summarize_counts(tally.counts(), served.names, served.lookup["values"])
+            frames, inferred_frames, tracking_lost = tally.frames, tally.inferred, tally.lost
+    except Exception as e:
+        logger.error(f"❌ Currency stream error: {e}", exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        served.release()
+
+    if new_notes:
+        logger.info(f"💰 +{new_notes} notes, tally {report['counts']} = ₹{report['total']}")
+    return jsonify({
+        "success": True,
+        **report,
+        "message": describe_notes(report["denominations"], report["total"]),
+        "newNotes": new_notes,
+        "inferred": inferred,
+        "frames": frames,
+        "inferredFrames": inferred_frames,
+        "trackingLost": tracking_lost,  # nothing is counted until the camera finds the notes again
+        "inferenceTime": round(inference_time, 2),
+        "processingTime": round((time.time() - start_time) * 1000, 2),  # ms
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route('/currency/stream/reset', methods=['POST'])
+def reset_currency_stream():
+    """Start a new tally for the calling client."""
+    tally = sessions.get(get_client_id()).currency
+    with tally.lock:
+        tally.reset()
+    return jsonify({"message": "Currency tally reset", "timestamp": datetime.now().isoformat()})
+
 # ==================== STARTUP ====================
-if __name__ == '__main__':
-    print("\n" + "="*60)
-    print("🚀 VISUAL ASSISTANCE DETECTION SERVER")
-    print("="*50 + "\n")
-    
-    # Initialize model
+def load_in_background():
+    """Load and warm up the model while the server already answers /health/live."""
     if not initialize_model():
         print("\n❌ Failed to initialize model. Exiting.")
         print("💡 Troubleshooting:")
@@ -571,29 +1551,49 @@ if __name__ == '__main__':
         print("   2. Update to latest version: pip install --upgrade ultralytics")
         print("   3. Check internet connection (model will download on first run)")
         print("   4. Check PyTorch installation: pip install torch torchvision")
-        exit(1)
+        os._exit(1)
+
+    total = sum(startup_timings.values())
+    phases = ", ".join(f"{phase} {ms:.0f} ms" for phase, ms in startup_timings.items())
+    print(f"✅ Ready in {total / 1000:.1f}s on {device.upper()} ({inference_backend}): {phases}")
+
+
+if __name__ == '__main__':
+    print("\n" + "="*60)
+    print("🚀 VISUAL ASSISTANCE DETECTION SERVER")
+    print("="*50 + "\n")
     
-    print("\n" + "="*50)
     print("📡 Server Configuration:")
     print(f"   • Host: 0.0.0.0")
     print(f"   • Port: 5000")
-    print(f"   • Model: {config.MODEL_FILE}")
-    print(f"   • Device: {'GPU' if torch.cuda.is_available() else 'CPU'}")
+    print(f"   • Model: {config.MODEL_FILE} ({config.INFERENCE_BACKEND})")
     print(f"   • Confidence: {config.CONFIDENCE_THRESHOLD}")
+    print(f"   • Transcription: {config.TRANSCRIPTION_BACKEND}")
     print("="*50 + "\n")
     
     print("🎯 Available endpoints:")
-    print("   • POST /detect     - Object detection")
-    print("   • POST /transcribe - Voice to text transcription")
-    print("   • GET  /health     - Health check")
-    print("   • GET  /stats      - Statistics")
-    print("   • POST /reset      - Reset cooldowns")
+    print("   • POST /detect       - Object detection")
+    print("   • WS   frame         - Streaming detection (socket.io)")
+    print("   • POST /currency     - Banknote counting")
+    print("   • POST /currency/stream - Running banknote tally while panning")
+    print("   • POST /transcribe   - Voice to text transcription")
+    print("   • GET  /health       - Health check")
+    print("   • GET  /health/live  - Liveness (process is up)")
+    print("   • GET  /health/ready - Readiness (model loaded and warmed up)")
+    print("   • GET  /stats        - Statistics")
+    print("   • POST /reset        - Reset cooldowns")
     print("\n" + "="*50 + "\n")
     
-    # Run server
-    app.run(
+    # Model loads in the background; /detect answers 503 until it is ready
+    threading.Thread(target=load_in_background, name="model-loader", daemon=True).start()
+    threading.Thread(target=warm_up_speech, name="speech-loader", daemon=True).start()
+    threading.Thread(target=preload_models, name="model-preloader", daemon=True).start()
+
+    # Run server (socket.io wraps the threaded Flask server)
+    socketio.run(
+        app,
         host='0.0.0.0', 
         port=5000, 
         debug=False,
-        threaded=True
-    )
\ No newline at end of file
+        allow_unsafe_werkzeug=True
+    )
@@ -0,0 +1,119 @@
+"""
+Per-client session state for the detection server.
+
+Every connected phone gets its own Session holding its object tracks (which
+carry the alert cooldowns), static-scene cache, running currency tally and
+frame counter, so one user's "person" alert never mutes another user's.
+Sessions idle for longer than the TTL are evicted, and the store never holds
+more than max_sessions (least recently seen sessions go first).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from currency import CurrencyTally
+from scene import SceneCache
+from tracking import Tracker
+
+
+class Session:
+    """State for one client."""
+
+    def __init__(self, client_id: str, tracker: Tracker, scene: SceneCache = None,
+                 currency: CurrencyTally = None):
+        self.client_id = client_id
+        self.created = time.time()
+        self.last_seen = self.created
+        self.frame_count = 0
+        self.input_size = None  # YOLO input size of the last inference, reported with reused results
+        self.tracker = tracker  # object tracks, which also carry the alert cooldowns
+        self.scene = scene if scene is not None else SceneCache()  # last inferred frame, for static scenes
+        self.currency = currency if currency is not None else CurrencyTally()  # Mudra streaming tally
+        self.lock = threading.Lock()
+
+    def next_frame(self) -> int:
+        """Count a new frame and return its number."""
+        with self.lock:
+            self.frame_count += 1
+            return self.frame_count
+
+    def reset_cooldowns(self):
+        self.tracker.reset_alerts()
+
+
+class SessionStore:
+    """Thread-safe client id -> Session map with TTL and size bounds."""
+
+    def __init__(self, ttl: float = 300.0, max_sessions: int = 1000, tracker_factory=Tracker,
+                 scene_factory=SceneCache, currency_factory=CurrencyTally):
+        self.ttl = ttl
+        self.tracker_factory = tracker_factory
+        self.scene_factory = scene_factory
+        self.currency_factory = currency_factory
+        self.max_sessions = max(1, int(max_sessions))
+        self._sessions = OrderedDict()  # ordered by last_seen, oldest first
+        self._lock = threading.Lock()
+
+        # Counters for /stats
+        self.created = 0
+        self.evicted = 0
+
+    def get(self, client_id: str) -> Session:
+        """Return the client's session, creating it if needed, and mark it as seen."""
+        now = time.time()
+        with self._lock:
+            self._evict_expired(now)
+
+            session = self._sessions.get(client_id)
+            if session is None:
+                session = Session(client_id, self.tracker_factory(), self.scene_factory(),
+                                  self.currency_factory())
+                self._sessions[client_id] = session
+                self.created += 1
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evicted += 1
+            else:
+                self._sessions.move_to_end(client_id)
+
+            session.last_seen = now
+            return session
+
+    def reset(self, client_id: str = None) -> int:
+        """Reset cooldowns for one client, or for every client. Returns sessions reset."""
+        with self._lock:
+            if client_id is None:
+                sessions = list(self._sessions.values())
+            else:
+                sessions = [self._sessions[client_id]] if client_id in self._sessions else []
+        for session in sessions:
+            session.reset_cooldowns()
+        return len(sessions)
+
+    def remove(self, client_id: str):
+        with self._lock:
+            self._sessions.pop(client_id, None)
+
+    def _evict_expired(self, now: float):
+        # Oldest sessions are at the front, so stop at the first live one
+        while self._sessions:
+            client_id, session = next(iter(self._sessions.items()))
+            if now - session.last_seen < self.ttl:
+                break
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._evict_expired(time.time())
+            return {
+                "active": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl": self.ttl,
+                "created": self.created,
+                "evicted": self.evicted,
+            }
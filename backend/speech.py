@@ -0,0 +1,361 @@
+"""
+Speech-to-text backends for /transcribe.
+
+Every backend returns a Transcript with the text and per-segment quality
+metadata (no_speech_prob, avg_logprob, compression_ratio), so the same noise
+filter applies whichever engine ran:
+
+  - GroqBackend: Groq's hosted Whisper API (needs GROQ_API_KEY and internet)
+  - LocalWhisperBackend: a small Whisper model on CPU through faster-whisper
+    (CTranslate2, INT8). Loaded once, warmed up, and works fully offline.
+
+Calls run on a TranscriptionQueue: a small, bounded pool of worker threads
+with a per-request deadline, so slow or hung transcriptions pile up there
+(and get refused once it is full) instead of tying up the request threads
+that serve /detect.
+"""
+
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from admission import Overloaded
+from audio import encode_opus
+
+logger = logging.getLogger(__name__)
+
+# Whisper hallucinates these on silence or background noise
+NOISE_PHRASES = {'thank you', 'thanks', 'you', 'bye', 'thank', 'you.'}
+MAX_NO_SPEECH_PROB = 0.5      # average over segments; above this it's likely silence/noise
+LOW_CONFIDENCE_LOGPROB = -1.0  # average over segments; below this the text is unreliable
+
+DEFAULT_PROMPT = "Voice commands for navigation: Netra for vision, Mudra for currency, Marga for navigation."
+
+
+@dataclass
+class Transcript:
+    text: str
+    segments: list = field(default_factory=list)  # dicts: text, avg_logprob, no_speech_prob, compression_ratio
+    language: str = None
+    duration: float = None
+
+    @property
+    def avg_no_speech_prob(self) -> float:
+        if not self.segments:
+            return None
+        return sum(seg.get('no_speech_prob', 0) for seg in self.segments) / len(self.segments)
+
+    @property
+    def avg_logprob(self) -> float:
+        if not self.segments:
+            return None
+        return sum(seg.get('avg_logprob', 0) for seg in self.segments) / len(self.segments)
+
+
+def noise_reason(transcript: Transcript) -> str:
+    """Why the transcript looks like noise rather than a command, or None if it looks like speech."""
+    if transcript.text.lower().strip() in NOISE_PHRASES:
+        return f"common noise phrase '{transcript.text}'"
+    no_speech = transcript.avg_no_speech_prob
+    if no_speech is not None and no_speech > MAX_NO_SPEECH_PROB:
+        return f"high no-speech probability {no_speech:.2f}"
+    return None
+
+
+# ==================== BACKENDS ====================
+class TranscriptionBackend:
+    """Turns an uploaded audio file into a Transcript."""
+
+    name = "base"
+
+    def load(self):
+        """Load models / clients. Called once; later calls are no-ops."""
+
+    def warm_up(self):
+        """Run a throwaway transcription so the first real request is fast."""
+
+    def transcribe(self, audio: bytes, filename: str = 'audio.m4a') -> Transcript:
+        raise NotImplementedError
+
+    def transcribe_pcm(self, pcm: np.ndarray, upload: bytes = None, filename: str = 'audio.m4a') -> Transcript:
+        """
+        Transcribe 16 kHz mono float PCM (the trimmed speech of upload). By
+        default it is sent as an Ogg/Opus file, or as the original upload
+        when that is no bigger, so the request never grows.
+        """
+        try:
+            encoded = encode_opus(pcm)
+        except Exception as e:
+            if upload is None:
+                raise
+            logger.warning(f"⚠️  Could not encode speech as Opus ({e}), sending the upload")
+            return self.transcribe(upload, filename=filename)
+        if upload is not None and len(upload) <= len(encoded):
+            return self.transcribe(upload, filename=filename)
+        return self.transcribe(encoded, filename='audio.ogg')
+
+
+class GroqBackend(TranscriptionBackend):
+    """Groq's hosted Whisper API."""
+
+    name = "groq"
+
+    def __init__(self, api_key: str, model: str = "whisper-large-v3-turbo", language: str = "en",
+                 prompt: str = DEFAULT_PROMPT, base_url: str = None, timeout: float = 10.0,
+                 max_connections: int = 4):
+        if not api_key:
+            raise RuntimeError("Groq API key not configured")
+        self.api_key = api_key
+        self.model = model
+        self.language = language
+        self.prompt = prompt
+        self.base_url = base_url  # None = api.groq.com; point at fake_speech_api.py for tests
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self._client is None:
+                import httpx
+                from groq import Groq
+
+                # One pooled, keep-alive client for all calls, with a hard
+                # per-call timeout and no retries so a call's time is bounded
+                timeout = httpx.Timeout(self.timeout, connect=min(self.timeout, 3.0))
+                self._client = Groq(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    timeout=timeout,
+                    max_retries=0,
+                    http_client=httpx.Client(
+                        timeout=timeout,
+                        limits=httpx.Limits(
+                            max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections
+                        )
+                    )
+                )
+
+    def transcribe(self, audio: bytes, filename: str = 'audio.m4a') -> Transcript:
+        self.load()
+        response = self._client.audio.transcriptions.create(
+            file=(filename, audio),  # Pass as tuple (filename, bytes)
+            model=self.model,
+            language=self.language,  # Improves accuracy and latency
+            response_format="verbose_json",
+            temperature=0.0,  # Most deterministic output
+            prompt=self.prompt  # Context helps accuracy
+        )
+        return Transcript(
+            text=response.text.strip(),
+            segments=list(getattr(response, 'segments', None) or []),
+            language=getattr(response, 'language', None),
+            duration=getattr(response, 'duration', None)
+        )
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """Whisper on the local CPU through faster-whisper (CTranslate2)."""
+
+    name = "local"
+
+    def __init__(self, model: str = "base.en", compute_type: str = "int8", cpu_threads: int = 0,
+                 language: str = "en", prompt: str = DEFAULT_PROMPT):
+        self.model_name = model  # size name ('tiny.en', 'base.en', ...) or a local model folder
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.language = language
+        self.prompt = prompt
+        self._model = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self._model is None:
+                from faster_whisper import WhisperModel
+                logger.info(f"🔄 Loading local Whisper model: {self.model_name} ({self.compute_type})...")
+                self._model = WhisperModel(
+                    self.model_name, device="cpu", compute_type=self.compute_type, cpu_threads=self.cpu_threads
+                )
+
+    def warm_up(self):
+        self.load()
+        self._transcribe(np.zeros(16000, dtype=np.float32))  # one second of silence
+
+    def transcribe(self, audio: bytes, filename: str = 'audio.m4a') -> Transcript:
+        self.load()
+        return self._transcribe(io.BytesIO(audio))
+
+    def transcribe_pcm(self, pcm: np.ndarray, upload: bytes = None, filename: str = 'audio.m4a') -> Transcript:
+        self.load()
+        return self._transcribe(pcm)  # already 16 kHz mono, no re-encode
+
+    def _transcribe(self, audio) -> Transcript:
+        segments, info = self._model.transcribe(
+            audio,
+            language=self.language,
+            temperature=0.0,
+            beam_size=1,  # greedy: commands are a few words
+            initial_prompt=self.prompt,
+            condition_on_previous_text=False
+        )
+        segments = [
+            {
+                'text': seg.text,
+                'avg_logprob': seg.avg_logprob,
+                'no_speech_prob': seg.no_speech_prob,
+                'compression_ratio': seg.compression_ratio
+            }
+            for seg in segments  # a generator: decoding happens here
+        ]
+        return Transcript(
+            text="".join(seg['text'] for seg in segments).strip(),
+            segments=segments,
+            language=info.language,
+            duration=info.duration
+        )
+
+
+# ==================== BOUNDED EXECUTION ====================
+class TranscriptionQueue:
+    """Runs transcriptions on a few worker threads, with a bounded backlog and a deadline."""
+
+    def __init__(self, workers: int = 2, max_pending: int = 8, timeout: float = 15.0,
+                 retry_after: float = 1.0):
+        self.workers = max(1, int(workers))
+        self.max_pending = max(0, int(max_pending))
+        self.timeout = timeout
+        self.retry_after = retry_after
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="transcribe")
+        self._lock = threading.Lock()
+        self._outstanding = 0  # queued + running
+        self._running = 0
+
+        # Counters for /stats
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Transcriptions waiting for a worker."""
+        with self._lock:
+            return self._outstanding - self._running
+
+    def run(self, fn, *args):
+        """
+        Run fn(*args) on a worker and wait for its result. Raises Overloaded
+        when the backlog is full and TimeoutError when the deadline passes
+        (the call itself is left to its own HTTP timeout).
+        """
+        with self._lock:
+            if self._outstanding >= self.workers + self.max_pending:
+                self.rejected += 1
+                raise Overloaded(self.retry_after)
+            self._outstanding += 1
+
+        future = self._executor.submit(self._call, fn, args)
+        future.add_done_callback(self._finished)  # also runs if cancelled before starting
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:  # not the builtin TimeoutError before Python 3.11
+            with self._lock:
+                self.timed_out += 1
+            future.cancel()  # drops it if it never started
+            raise TimeoutError(f"Transcription took longer than {self.timeout:.0f}s")
+
+    def _call(self, fn, args):
+        with self._lock:
+            self._running += 1
+        try:
+            result = fn(*args)
+            with self._lock:
+                self.completed += 1
+            return result
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _finished(self, future):
+        with self._lock:
+            self._outstanding -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "running": self._running,
+                "queue_depth": self._outstanding - self._running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+
+# ==================== TRANSCRIPT CACHE ====================
+def audio_key(pcm: np.ndarray = None, raw: bytes = None) -> str:
+    """Cache key for a recording: a hash of its decoded, trimmed PCM (or of the file if it didn't decode)."""
+    if pcm is not None:
+        data = (np.clip(pcm, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+    else:
+        data = raw
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class TranscriptCache:
+    """Bounded LRU of audio key -> Transcript, so repeated identical uploads skip the backend."""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max(0, int(max_size))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters for /stats
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Transcript:
+        with self._lock:
+            transcript = self._entries.get(key)
+            if transcript is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return transcript
+
+    def put(self, key: str, transcript: Transcript):
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._entries[key] = transcript
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
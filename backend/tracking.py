@@ -0,0 +1,182 @@
+"""
+Lightweight multi-object tracker for the detection server.
+
+Associates each frame's detections with the previous frame's by IoU (with a
+centroid-distance fallback for small, fast-moving boxes), so every object
+keeps a stable track id. Each track also estimates how fast it is approaching
+(relative growth of its box area per second) and how its box moves, which is
+used to extrapolate boxes on frames where YOLO is skipped.
+"""
+
+import threading
+
+import numpy as np
+
+
+def box_iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """IoU of one xyxy box against an (N, 4) array of boxes."""
+    ix1 = np.maximum(box[0], boxes[:, 0])
+    iy1 = np.maximum(box[1], boxes[:, 1])
+    ix2 = np.minimum(box[2], boxes[:, 2])
+    iy2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    union = area + areas - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class Track:
+    """One tracked object."""
+
+    def __init__(self, track_id: int, class_id: int, box: np.ndarray, confidence: float, now: float):
+        self.track_id = track_id
+        self.class_id = class_id
+        self.box = box.astype(float)
+        self.confidence = confidence
+        self.first_seen = now
+        self.last_seen = now
+        self.hits = 1
+
+        self.box_velocity = np.zeros(4)  # pixels per second for x1, y1, x2, y2
+        self.approach_rate = 0.0         # relative area growth per second (>0 = getting closer)
+
+        # Alert state: the distance rank last announced and when
+        self.announced_rank = None
+        self.last_announced = 0.0
+
+    @property
+    def area(self) -> float:
+        return max(0.0, (self.box[2] - self.box[0]) * (self.box[3] - self.box[1]))
+
+    def update(self, box: np.ndarray, confidence: float, now: float, smoothing: float):
+        dt = now - self.last_seen
+        if dt > 0:
+            old_area = self.area
+            velocity = (box - self.box) / dt
+            self.box_velocity = smoothing * velocity + (1 - smoothing) * self.box_velocity
+            if old_area > 0:
+                new_area = max(0.0, (box[2] - box[0]) * (box[3] - box[1]))
+                rate = (new_area / old_area - 1.0) / dt
+                self.approach_rate = smoothing * rate + (1 - smoothing) * self.approach_rate
+
+        self.box = box.astype(float)
+        self.confidence = confidence
+        self.last_seen = now
+        self.hits += 1
+
+    def predict_box(self, now: float, frame_width: int, frame_height: int) -> np.ndarray:
+        """Box extrapolated to `now` with the smoothed velocity, clipped to the frame."""
+        box = self.box + self.box_velocity * (now - self.last_seen)
+        box[[0, 2]] = np.clip(box[[0, 2]], 0, frame_width)
+        box[[1, 3]] = np.clip(box[[1, 3]], 0, frame_height)
+        return box
+
+    def should_announce(self, distance_rank: int, cooldown: float, now: float) -> bool:
+        """
+        Announce a new object, an object that moved into a closer distance
+        bucket, or one whose cooldown has expired.
+        """
+        if (self.announced_rank is None
+                or distance_rank > self.announced_rank
+                or now - self.last_announced >= cooldown):
+            self.announced_rank = distance_rank
+            self.last_announced = now
+            return True
+        return False
+
+
+class Tracker:
+    """IoU / centroid tracker over the detections of one client's frames."""
+
+    def __init__(self, iou_threshold: float = 0.3, max_age: float = 1.5,
+                 max_tracks: int = 32, smoothing: float = 0.5):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.max_tracks = max_tracks
+        self.smoothing = smoothing
+
+        self.tracks = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def update(self, class_ids: list, boxes: np.ndarray, confidences: list, now: float) -> list:
+        """
+        Match this frame's detections to existing tracks.
+        Returns the Track for each detection, in the same order.
+        """
+        with self._lock:
+            self._expire(now)
+
+            assigned = [None] * len(class_ids)
+            free_tracks = list(self.tracks)
+
+            # Greedy IoU matching, best overlaps first, same class only
+            candidates = []
+            for ti, track in enumerate(free_tracks):
+                if len(boxes) == 0:
+                    break
+                ious = box_iou(track.box, boxes)
+                for di in np.nonzero(ious >= self.iou_threshold)[0]:
+                    if class_ids[di] == track.class_id:
+                        candidates.append((ious[di], ti, di))
+            candidates.sort(key=lambda c: c[0], reverse=True)
+
+            used_tracks = set()
+            for _, ti, di in candidates:
+                if ti in used_tracks or assigned[di] is not None:
+                    continue
+                used_tracks.add(ti)
+                assigned[di] = free_tracks[ti]
+
+            # Centroid fallback: small or fast boxes may not overlap between frames
+            for di, track in enumerate(assigned):
+                if track is not None:
+                    continue
+                cx = (boxes[di, 0] + boxes[di, 2]) / 2
+                cy = (boxes[di, 1] + boxes[di, 3]) / 2
+                best, best_dist = None, None
+                for ti, candidate in enumerate(free_tracks):
+                    if ti in used_tracks or candidate.class_id != class_ids[di]:
+                        continue
+                    tx = (candidate.box[0] + candidate.box[2]) / 2
+                    ty = (candidate.box[1] + candidate.box[3]) / 2
+                    reach = max(candidate.box[2] - candidate.box[0], candidate.box[3] - candidate.box[1])
+                    dist = ((cx - tx) ** 2 + (cy - ty) ** 2) ** 0.5
+                    if dist <= reach and (best_dist is None or dist < best_dist):
+                        best, best_dist = ti, dist
+                if best is not None:
+                    used_tracks.add(best)
+                    assigned[di] = free_tracks[best]
+
+            for di, track in enumerate(assigned):
+                if track is not None:
+                    track.update(boxes[di], confidences[di], now, self.smoothing)
+                else:
+                    track = Track(self._next_id, class_ids[di], boxes[di], confidences[di], now)
+                    self._next_id += 1
+                    self.tracks.append(track)
+                    assigned[di] = track
+
+            # Bound memory: keep the most recently seen tracks
+            if len(self.tracks) > self.max_tracks:
+                self.tracks.sort(key=lambda t: t.last_seen, reverse=True)
+                del self.tracks[self.max_tracks:]
+
+            return assigned
+
+    def active_tracks(self, now: float) -> list:
+        """Tracks seen within max_age, for extrapolation."""
+        with self._lock:
+            self._expire(now)
+            return list(self.tracks)
+
+    def reset_alerts(self):
+        """Forget what was announced, so every current track is announced again."""
+        with self._lock:
+            for track in self.tracks:
+                track.announced_rank = None
+                track.last_announced = 0.0
+
+    def _expire(self, now: float):
+        self.tracks = [t for t in self.tracks if now - t.last_seen <= self.max_age]
@@ -13,6 +13,10 @@ Features:
 - Relative distance estimation (close, medium, far)
 - Priority alerts for important objects
 - Intelligent cooldown to prevent repetition
+- Pipelined mode (default): capture, inference and rendering run on their own
+  threads, handing over only the newest frame, so the camera never waits on
+  the model and alerts never wait on drawing. Run with --serial for the
+  original single-loop mode.
 
 Requirements:
 - ultralytics
@@ -22,15 +26,75 @@ Requirements:
 
 """
 
+import argparse
 import cv2
 import time
 import threading
-from collections import defaultdict
+from collections import defaultdict, deque
 import pyttsx3
 from ultralytics import YOLO
 import numpy as np
 
 
+class LatestFrameSlot:
+    """
+    Single-slot hand-off between two pipeline stages. A new item replaces
+    one the next stage has not taken yet (counted as dropped), so the next
+    stage always works on the newest frame and nothing queues up.
+    """
+
+    def __init__(self):
+        self._item = None
+        self._cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify()
+
+    def get(self, timeout=0.1):
+        """Take the item, waiting up to timeout. None if there is none."""
+        with self._cond:
+            if self._item is None and not self.closed:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class StageMeter:
+    """Frames per second of one pipeline stage over the last few seconds."""
+
+    def __init__(self, window=2.0):
+        self.window = window
+        self.frames = 0
+        self._times = deque()
+        self._lock = threading.Lock()
+
+    def tick(self):
+        now = time.time()
+        with self._lock:
+            self.frames += 1
+            self._times.append(now)
+            while self._times and now - self._times[0] > self.window:
+                self._times.popleft()
+
+    def fps(self):
+        with self._lock:
+            if len(self._times) < 2:
+                return 0.0
+            span = self._times[-1] - self._times[0]
+            return (len(self._times) - 1) / span if span > 0 else 0.0
+
+
 class YOLODetectionTTS:
     """
     A class for real-time object detection with priority safety alerts via TTS.
@@ -63,6 +127,12 @@ class YOLODetectionTTS:
         self.tts_queue = []
         self.tts_thread = None
         self.tts_lock = threading.Lock()
+
+        # Pipelined mode: stage hand-offs, fps meters and glass-to-alert latency
+        self.capture_slot = LatestFrameSlot()
+        self.render_slot = LatestFrameSlot()
+        self.meters = {name: StageMeter() for name in ("capture", "inference", "render")}
+        self.alert_latencies = deque(maxlen=100)  # seconds from frame capture to alert
     
     def setup_tts(self):
         try:
@@ -111,15 +181,16 @@ class YOLODetectionTTS:
 
     # ==================================================================
     # /// MODIFIED FUNCTION ///
-    # Now includes logic for priority alerts.
+    # Now includes logic for priority alerts. Split into analyze / draw /
+    # announce so the pipelined mode can alert before the frame is drawn.
     # ==================================================================
-    def draw_detections(self, frame, results):
+    def analyze_detections(self, frame_shape, results):
+        """Confident detections as (box, class_name, conf, position, distance, is_priority)."""
+        detections = []
         if not results or len(results) == 0:
-            return frame
+            return detections
         
-        objects_for_tts = []
-        
-        frame_height, frame_width, _ = frame.shape
+        frame_height, frame_width = frame_shape[:2]
         frame_area = frame_width * frame_height
         frame_center_x = frame_width / 2
         center_threshold = frame_width * 0.2
@@ -154,22 +225,28 @@ class YOLODetectionTTS:
                 if area_ratio > 0.15: distance_str = "close"
                 elif area_ratio > 0.05: distance_str = "at a medium distance"
 
-                objects_for_tts.append((class_name, position_str, distance_str, is_priority))
-
-                # --- DRAWING ON FRAME ---
-                # /// MODIFIED: Change box color based on priority ///
-                box_color = (0, 0, 255) if is_priority else (0, 255, 0) # Red for priority, Green for normal
-                
-                cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, 2)
-                label = f"{class_name}: {conf:.2f} ({distance_str.split(' ')[0]})"
-                label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
-                cv2.rectangle(frame, (x1, y1 - label_size[1] - 10), 
-                              (x1 + label_size[0], y1), box_color, -1)
-                cv2.putText(frame, label, (x1, y1 - 5), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+                detections.append(((x1, y1, x2, y2), class_name, conf, position_str, distance_str, is_priority))
         
+        return detections
+
+    def draw_boxes(self, frame, detections):
+        for (x1, y1, x2, y2), class_name, conf, _, distance_str, is_priority in detections:
+            # --- DRAWING ON FRAME ---
+            # /// MODIFIED: Change box color based on priority ///
+            box_color = (0, 0, 255) if is_priority else (0, 255, 0) # Red for priority, Green for normal
+            
+            cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, 2)
+            label = f"{class_name}: {conf:.2f} ({distance_str.split(' ')[0]})"
+            label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
+            cv2.rectangle(frame, (x1, y1 - label_size[1] - 10), 
+                          (x1 + label_size[0], y1), box_color, -1)
+            cv2.putText(frame, label, (x1, y1 - 5), 
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+        return frame
+
+    def announce(self, detections, captured_at=None):
         # --- HANDLE TTS ANNOUNCEMENTS ---
-        for obj_name, position, distance, is_priority in objects_for_tts:
+        for _, obj_name, _, position, distance, is_priority in detections:
             if self.should_announce(obj_name):
                 # /// MODIFIED: Add "Warning!" prefix for priority objects ///
                 if is_priority:
@@ -177,9 +254,15 @@ class YOLODetectionTTS:
                 else:
                     announcement = f"{obj_name} {distance} {position}"
                 
+                if captured_at is not None:
+                    self.alert_latencies.append(time.time() - captured_at)
                 print(f"🔊 Speaking: {announcement}")
                 self.speak_async(announcement)
-        
+
+    def draw_detections(self, frame, results):
+        detections = self.analyze_detections(frame.shape, results)
+        self.draw_boxes(frame, detections)
+        self.announce(detections)
         return frame
     
     def add_info_overlay(self, frame):
@@ -224,6 +307,101 @@ class YOLODetectionTTS:
         finally:
             self.cleanup()
     
+    # ==================================================================
+    # /// NEW: PIPELINED MODE ///
+    # capture thread -> [newest frame] -> inference thread -> [newest result]
+    # -> render loop (main thread, as cv2.imshow requires)
+    # ==================================================================
+    def capture_worker(self):
+        while self.running:
+            ret, frame = self.cap.read()
+            if not ret or frame is None:
+                time.sleep(0.01)
+                continue
+            self.capture_slot.put((frame, time.time()))
+            self.meters["capture"].tick()
+
+    def inference_worker(self):
+        while self.running:
+            item = self.capture_slot.get()
+            if item is None: continue
+            frame, captured_at = item
+            try:
+                results = self.model(frame, verbose=False)
+                detections = self.analyze_detections(frame.shape, results)
+                # Alert straight from the inference stage, without waiting for drawing
+                self.announce(detections, captured_at)
+                self.render_slot.put((frame, detections))
+                self.meters["inference"].tick()
+            except Exception as e:
+                print(f"⚠ Warning: Detection error: {e}")
+
+    def pipeline_stats(self):
+        """fps and dropped frames per stage, and glass-to-alert latency in ms."""
+        latencies = list(self.alert_latencies)
+        return {
+            "capture": {"fps": round(self.meters["capture"].fps(), 1), "frames": self.meters["capture"].frames},
+            "inference": {"fps": round(self.meters["inference"].fps(), 1), "frames": self.meters["inference"].frames,
+                          "dropped": self.capture_slot.dropped},
+            "render": {"fps": round(self.meters["render"].fps(), 1), "frames": self.meters["render"].frames,
+                       "dropped": self.render_slot.dropped},
+            "alert_latency_ms": round(1000 * sum(latencies) / len(latencies)) if latencies else None,
+        }
+
+    def add_pipeline_overlay(self, frame):
+        stats = self.pipeline_stats()
+        lines = [
+            f"capture {stats['capture']['fps']:.1f} fps",
+            f"inference {stats['inference']['fps']:.1f} fps (dropped {stats['inference']['dropped']})",
+            f"render {stats['render']['fps']:.1f} fps (dropped {stats['render']['dropped']})",
+        ]
+        if stats["alert_latency_ms"] is not None:
+            lines.append(f"glass-to-alert {stats['alert_latency_ms']:.0f} ms")
+        for i, line in enumerate(lines):
+            cv2.putText(frame, line, (10, 20 + i * 20), 
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+        return frame
+
+    def run_pipelined(self):
+        workers = []
+        try:
+            self.initialize_webcam()
+            self.running = True
+            self.tts_thread = threading.Thread(target=self.tts_worker, daemon=True)
+            self.tts_thread.start()
+            for target in (self.capture_worker, self.inference_worker):
+                worker = threading.Thread(target=target, daemon=True)
+                worker.start()
+                workers.append(worker)
+            
+            print("\n" + "="*50)
+            print("🎥 Real-time YOLO Detection with Priority Alerts (pipelined)")
+            print("="*50 + "\n")
+            
+            while self.running:
+                item = self.render_slot.get()
+                if item is not None:
+                    frame, detections = item
+                    frame = self.draw_boxes(frame, detections)
+                    frame = self.add_info_overlay(frame)
+                    frame = self.add_pipeline_overlay(frame)
+                    cv2.imshow('YOLO Detection with Priority Alerts', frame)
+                    self.meters["render"].tick()
+                
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'): break
+                elif key == ord('r'): self.last_spoken_time.clear()
+        
+        except Exception as e:
+            print(f"✗ Error in detection loop: {e}")
+        finally:
+            self.running = False
+            self.capture_slot.close()
+            self.render_slot.close()
+            for worker in workers: worker.join(timeout=2)
+            print(f"📊 Pipeline: {self.pipeline_stats()}")
+            self.cleanup()
+    
     def cleanup(self):
         # This function is unchanged
         print("\n🧹 Cleaning up resources...")
@@ -234,9 +412,17 @@ class YOLODetectionTTS:
         print("✓ Cleanup completed")
 
 def main():
+    parser = argparse.ArgumentParser(description="Real-time YOLO detection with priority voice alerts")
+    parser.add_argument("--serial", action="store_true",
+                        help="capture, detect and draw on one thread (original mode)")
+    args = parser.parse_args()
+
     try:
         detector = YOLODetectionTTS(model_path="yolov8n.pt", cooldown_time=3.0)
-        detector.run_detection()
+        if args.serial:
+            detector.run_detection()
+        else:
+            detector.run_pipelined()
     except Exception as e:
         print(f"\n✗ Error: {e}")
     finally:
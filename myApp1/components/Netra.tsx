@@ -544,6 +544,7 @@ import {
 } from "react-native";
 import { CameraView, useCameraPermissions } from "expo-camera";
 import * as Speech from "expo-speech";
+import { Gyroscope } from "expo-sensors";
 import { Feather, FontAwesome5 } from "@expo/vector-icons";
 
 // --- TYPES ---
@@ -570,6 +571,9 @@ interface ServerResponse {
   detections: Detection[];
   frameWidth: number;
   frameHeight: number;
+  skipped?: boolean;
+  frameIntervalMs?: number;
+  jpegQuality?: number;
 }
 
 interface Props {
@@ -581,12 +585,13 @@ const { width: SCREEN_WIDTH, height: SCREEN_HEIGHT } = Dimensions.get("window");
 // --- CONFIG ---
 const CONFIG = {
   SERVER_URL: "http://192.168.29.172:5000/detect",
-  FRAME_RATE: 10,
+  FRAME_RATE: 10, // until the server sends frameIntervalMs
   REQUEST_TIMEOUT: 5000,
   RECONNECT_DELAY: 1000,
-  IMAGE_QUALITY: 0.15,
+  IMAGE_QUALITY: 0.15, // until the server sends jpegQuality
   MAX_RETRY_ATTEMPTS: 5,
   SPEECH_COOLDOWN: 3000,
+  MOTION_UPDATE_INTERVAL: 50, // gyroscope sample period (ms) for the motion hint
 };
 
 // --- THEME ---
@@ -624,6 +629,15 @@ export default function Netra({ onBack }: Props) {
   const mountedRef = useRef(true);
   const frameLoopTimeoutRef = useRef<ReturnType<typeof setTimeout> | null>(null);
   const lastAlertTextRef = useRef<string>("System Ready");
+  // Identifies this phone to the server so alert cooldowns are per user
+  const clientIdRef = useRef(
+    `netra-${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 8)}`
+  );
+  // Peak rotation rate (rad/s) since the last frame; lets the server skip YOLO when the phone is still
+  const motionRef = useRef(0);
+  // Frame pacing and JPEG quality, adjusted from the server's load hints
+  const frameDelayRef = useRef(1000 / CONFIG.FRAME_RATE);
+  const imageQualityRef = useRef(CONFIG.IMAGE_QUALITY);
 
   const [cameraLayout, setCameraLayout] = useState<{ w: number; h: number }>({
     w: SCREEN_WIDTH,
@@ -687,6 +701,15 @@ export default function Netra({ onBack }: Props) {
     };
   }, []);
 
+  useEffect(() => {
+    if (!isRunning) return;
+    Gyroscope.setUpdateInterval(CONFIG.MOTION_UPDATE_INTERVAL);
+    const subscription = Gyroscope.addListener(({ x, y, z }) => {
+      motionRef.current = Math.max(motionRef.current, Math.sqrt(x * x + y * y + z * z));
+    });
+    return () => subscription.remove();
+  }, [isRunning]);
+
   const stopDetection = useCallback(() => {
     runningRef.current = false;
     setIsRunning(false);
@@ -702,7 +725,7 @@ export default function Netra({ onBack }: Props) {
     processingRef.current = true;
     try {
       const photo = await cameraRef.current.takePictureAsync({
-        quality: CONFIG.IMAGE_QUALITY,
+        quality: imageQualityRef.current,
         skipProcessing: true,
         base64: false,
         exif: false,
@@ -719,6 +742,9 @@ export default function Netra({ onBack }: Props) {
         type: "image/jpeg",
         name: "frame.jpg",
       } as any);
+      formData.append("clientId", clientIdRef.current);
+      formData.append("motion", motionRef.current.toFixed(3));
+      motionRef.current = 0;
 
       const controller = new AbortController();
       const timeoutId = setTimeout(
@@ -739,6 +765,11 @@ export default function Netra({ onBack }: Props) {
 
       const data: ServerResponse = await response.json();
       if (!mountedRef.current) return;
+      // Server replaced this frame with a newer one, keep the current overlay
+      if (data.skipped) return;
+
+      if (data.frameIntervalMs) frameDelayRef.current = data.frameIntervalMs;
+      if (data.jpegQuality) imageQualityRef.current = data.jpegQuality;
 
       updateDetections(data.detections || []);
       setServerW(data.frameWidth || 1);
@@ -766,12 +797,11 @@ export default function Netra({ onBack }: Props) {
   }, [handleAlerts, stopDetection, updateDetections]);
 
   const startRealtimeLoop = useCallback(() => {
-    const frameDelay = 1000 / CONFIG.FRAME_RATE;
     const loop = async () => {
       if (!runningRef.current || !mountedRef.current) return;
       await captureAndSendFrame();
       if (runningRef.current && mountedRef.current) {
-        frameLoopTimeoutRef.current = setTimeout(loop, frameDelay);
+        frameLoopTimeoutRef.current = setTimeout(loop, frameDelayRef.current);
       }
     };
     loop();
@@ -283,7 +283,7 @@ export default function VoiceAssistant({ onNavigate, onClose }: VoiceAssistantPr
       if (data.success && data.text && data.text.length > 0) {
         console.log(`✅ Transcription successful: "${data.text}"`);
         setTranscribedText(data.text);
-        processCommand(data.text);
+        processCommand(data.text, data.intent);
       } else if (data.error) {
         // Specific error message from server
         console.log(`❌ Error from server: ${data.error}`);
@@ -302,23 +302,35 @@ export default function VoiceAssistant({ onNavigate, onClose }: VoiceAssistantPr
     }
   };
 
-  const processCommand = (text: string) => {
+  const processCommand = (text: string, intent?: string | null) => {
     const lowerText = text.toLowerCase();
     
-    // Navigation commands
-    if (lowerText.includes('netra') || lowerText.includes('vision') || lowerText.includes('detection') || lowerText.includes('eye')) {
+    // Navigation commands: the server's resolved intent wins (it also covers
+    // misheard names like "nethra"); keyword checks are only the fallback
+    let mode = intent;
+    if (!mode) {
+      if (lowerText.includes('netra') || lowerText.includes('vision') || lowerText.includes('detection') || lowerText.includes('eye')) {
+        mode = 'NETRA';
+      } else if (lowerText.includes('mudra') || lowerText.includes('currency') || lowerText.includes('money') || lowerText.includes('finance') || lowerText.includes('rupee')) {
+        mode = 'MUDRA';
+      } else if (lowerText.includes('marga') || lowerText.includes('navigation') || lowerText.includes('navigate') || lowerText.includes('route') || lowerText.includes('direction')) {
+        mode = 'MARGA';
+      }
+    }
+
+    if (mode === 'NETRA') {
       Speech.speak('Opening Netra vision mode', {
         onDone: () => {
           setTimeout(() => onNavigate('NETRA'), 300);
         }
       });
-    } else if (lowerText.includes('mudra') || lowerText.includes('currency') || lowerText.includes('money') || lowerText.includes('finance') || lowerText.includes('rupee')) {
+    } else if (mode === 'MUDRA') {
       Speech.speak('Opening Mudra currency assistant', {
         onDone: () => {
           setTimeout(() => onNavigate('MUDRA'), 300);
         }
       });
-    } else if (lowerText.includes('marga') || lowerText.includes('navigation') || lowerText.includes('navigate') || lowerText.includes('route') || lowerText.includes('direction')) {
+    } else if (mode === 'MARGA') {
       Speech.speak('Opening Marga navigation mode', {
         onDone: () => {
           setTimeout(() => onNavigate('MARGA'), 300);